@@ -6,13 +6,52 @@ Analyzes user's code to understand their current approach and provide targeted h
 
 import re
 import ast
-from typing import Dict, List, Optional, Set
+import io
+import hashlib
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import Dict, List
+
+
+def normalize_code(code: str) -> str:
+    """
+    Reduce code to its token stream so that edits to comments, blank lines or
+    spacing do not change it. Code that cannot be tokenized (e.g. unbalanced
+    brackets mid-edit) is returned as is: without tokens there is no telling
+    a comment from a '#' inside a string, or which spacing matters.
+    """
+    parts = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+            if tok.type in (tokenize.COMMENT, tokenize.NL, tokenize.ENDMARKER):
+                continue
+            if tok.type == tokenize.NEWLINE:
+                parts.append('\n')
+            elif tok.type == tokenize.INDENT:
+                parts.append('>')
+            elif tok.type == tokenize.DEDENT:
+                parts.append('<')
+            else:
+                parts.append(tok.string)
+        return ' '.join(parts)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return code
+
+
+def code_fingerprint(code: str) -> str:
+    """Stable hash of the normalized code."""
+    return hashlib.sha256(normalize_code(code).encode('utf-8')).hexdigest()
 
 
 class CodeAnalyzer:
     """Analyzes Python code to extract information for context-aware hints."""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 256):
+        # Analyses are memoized by code hash: one parse per distinct submission
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.common_patterns = {
             'two_pointers': ['left', 'right', 'l', 'r', 'start', 'end'],
             'sliding_window': ['window', 'start', 'end', 'left', 'right'],
@@ -38,8 +77,25 @@ class CodeAnalyzer:
             question_category: Category of the question (e.g., "Two Pointers", "Hash Table")
             
         Returns:
-            Dictionary with analysis results
+            Dictionary with analysis results (shared; do not mutate)
         """
+        key = (hashlib.sha256(code.encode('utf-8')).hexdigest() if code else '', question_category)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        
+        analysis = self._analyze_code(code, question_category)
+        
+        with self._cache_lock:
+            self._cache[key] = analysis
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return analysis
+    
+    def _analyze_code(self, code: str, question_category: str) -> Dict:
+        """Uncached analysis behind analyze_code()."""
         analysis = {
             'has_solution_class': False,
             'has_method': False,
@@ -87,12 +143,13 @@ class CodeAnalyzer:
         # Check for conditionals
         analysis['has_conditionals'] = bool(re.search(r'\b(if|elif|else)\s+', code))
         
-        # Try to parse AST for deeper analysis
+        # Try to parse AST for deeper analysis; where it succeeds it replaces the
+        # text heuristics above (e.g. '{' in an f-string is not a dict)
         try:
             tree = ast.parse(code)
             ast_analysis = self._analyze_ast(tree)
             analysis.update(ast_analysis)
-        except SyntaxError:
+        except (SyntaxError, ValueError):
             # Code has syntax errors, but we can still provide basic analysis
             pass
         
@@ -214,15 +271,38 @@ class CodeAnalyzer:
         analysis = {
             'function_calls': [],
             'imports': [],
-            'complexity_score': 0
+            'complexity_score': 0,
+            'has_solution_class': False,
+            'has_method': False,
+            'method_name': None,
+            'has_return': False,
+            'has_loop': False,
+            'has_conditionals': False
         }
+        structures = set()
+        dict_factories = {'dict', 'defaultdict', 'Counter', 'OrderedDict'}
         
         for node in ast.walk(tree):
             if isinstance(node, ast.Call):
                 if isinstance(node.func, ast.Name):
-                    analysis['function_calls'].append(node.func.id)
+                    name = node.func.id
+                    analysis['function_calls'].append(name)
+                    if name in dict_factories:
+                        structures.add('dict')
+                    elif name in ('set', 'frozenset'):
+                        structures.add('set')
+                    elif name == 'list':
+                        structures.add('list')
+                    elif name == 'deque':
+                        structures.add('queue')
                 elif isinstance(node.func, ast.Attribute):
                     analysis['function_calls'].append(node.func.attr)
+                    if node.func.attr in dict_factories:
+                        structures.add('dict')
+                    elif node.func.attr == 'deque':
+                        structures.add('queue')
+                    elif node.func.attr.startswith('heap'):
+                        structures.add('heap')
             
             elif isinstance(node, ast.Import):
                 for alias in node.names:
@@ -231,6 +311,40 @@ class CodeAnalyzer:
             elif isinstance(node, ast.ImportFrom):
                 if node.module:
                     analysis['imports'].append(node.module)
+            
+            elif isinstance(node, (ast.Dict, ast.DictComp)):
+                structures.add('dict')
+            elif isinstance(node, (ast.Set, ast.SetComp)):
+                structures.add('set')
+            elif isinstance(node, (ast.List, ast.ListComp)):
+                structures.add('list')
+            elif isinstance(node, (ast.For, ast.While, ast.AsyncFor, ast.comprehension)):
+                analysis['has_loop'] = True
+            elif isinstance(node, (ast.If, ast.IfExp)):
+                analysis['has_conditionals'] = True
+            elif isinstance(node, ast.Return) and node.value is not None:
+                analysis['has_return'] = True
+            elif isinstance(node, ast.ClassDef) and node.name == 'Solution':
+                analysis['has_solution_class'] = True
+                methods = [n.name for n in node.body
+                           if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+                public = [name for name in methods if not name.startswith('_')]
+                if methods:
+                    analysis['has_method'] = True
+                    analysis['method_name'] = (public or methods)[0]
+        
+        # A list used with append() and pop() is a stack
+        calls = set(analysis['function_calls'])
+        if 'list' in structures and 'append' in calls and 'pop' in calls:
+            structures.add('stack')
+        analysis['data_structures'] = sorted(structures)
+        
+        # Code outside a Solution class still counts as having a method
+        if not analysis['has_method']:
+            functions = [n.name for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+            if functions:
+                analysis['has_method'] = True
+                analysis['method_name'] = functions[0]
         
         # Calculate simple complexity score
         analysis['complexity_score'] = len(analysis['function_calls']) + len(analysis['imports'])
@@ -321,3 +435,6 @@ class CodeAnalyzer:
         
         return ". ".join(summary_parts)
 
+
+# Global instance
+code_analyzer = CodeAnalyzer()
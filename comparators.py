@@ -0,0 +1,266 @@
+"""
+Per-question output comparators.
+Each question names the rule its answers are judged by (exact, unordered,
+unordered_nested, float_tolerance or in_place); the sandbox harness applies
+it next to the user's code. Large outputs are compared in one streaming pass
+and reported back as a digest plus a short excerpt, so megabyte results never
+cross the process boundary.
+"""
+import hashlib
+import json
+import math
+from collections import Counter
+from itertools import islice, repeat
+from typing import Callable, Dict, Optional
+
+# Comparator used when a question configures none
+DEFAULT_COMPARATOR = 'exact'
+
+# Built-in choices for Blind 75 problems whose answers are not a single exact value
+QUESTION_COMPARATORS = {
+    'two_sum': 'unordered',
+    'permutations': 'unordered',
+    'merge_intervals': 'unordered',
+    'pacific_atlantic_water_flow': 'unordered',
+    '3sum': 'unordered_nested',
+    'group_anagrams': 'unordered_nested',
+    'subsets': 'unordered_nested',
+    'combination_sum': 'unordered_nested',
+    'move_zeroes': 'in_place',
+    'rotate_image': 'in_place',
+    'set_matrix_zeroes': 'in_place',
+}
+
+# Outputs with more items than this are sent back as a digest and an excerpt
+DIGEST_MIN_ITEMS = 1000
+# Items (or characters) of a large output sent back to the server
+EXCERPT_ITEMS = 20
+# Items shown either side of a difference, and missing/unexpected items listed
+DIFF_CONTEXT = 2
+DIFF_ITEMS = 5
+
+FLOAT_REL_TOL = 1e-5
+FLOAT_ABS_TOL = 1e-5
+
+# Two salts give each item a 128-bit hash in the multiset digest
+_DIGEST_SALTS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+_DIGEST_MASK = (1 << 64) - 1
+
+
+def _hashable(value):
+    """Hashable stand-in for a value: lists become tuples, sets frozensets, dicts item sets."""
+    if isinstance(value, (list, tuple)):
+        return tuple(map(_hashable, value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(map(_hashable, value))
+    if isinstance(value, dict):
+        return frozenset((key, _hashable(item)) for key, item in value.items())
+    return value
+
+
+def _plain(value):
+    """JSON-ready copy of a _hashable value (tuples and sets back to lists)."""
+    if isinstance(value, (tuple, frozenset)):
+        return [_plain(item) for item in value]
+    return value
+
+
+def _item_counts(items) -> Counter:
+    """Counter of a list's items; plain scalars are counted at C speed, the rest via _hashable."""
+    try:
+        return Counter(items)
+    except TypeError:
+        return Counter(map(_hashable, items))
+
+
+def _sorted_inner(value):
+    """An item of a nested answer with its own order removed (e.g. one group of anagrams), as a tuple."""
+    if isinstance(value, (list, tuple)):
+        try:
+            return tuple(sorted(value))
+        except TypeError:
+            return tuple(sorted(map(_hashable, value), key=repr))
+    return value
+
+
+def multiset_digest(items) -> str:
+    """
+    Order-independent digest of a list: its length and the sums of two salted
+    hashes of its items, built in one pass without sorting or copying.
+    String hashes are salted per process, so digests are compared within a run.
+    """
+    items = items if isinstance(items, (list, tuple)) else list(items)
+    try:
+        parts = [sum(map(hash, zip(items, repeat(salt)))) & _DIGEST_MASK for salt in _DIGEST_SALTS]
+    except TypeError:
+        keys = list(map(_hashable, items))
+        parts = [sum(map(hash, zip(keys, repeat(salt)))) & _DIGEST_MASK for salt in _DIGEST_SALTS]
+    return f"{len(items)}:{parts[0]:016x}{parts[1]:016x}"
+
+
+def exact(result, expected, options: Dict) -> bool:
+    """Plain equality; list order matters."""
+    return result == expected
+
+
+def unordered(result, expected, options: Dict) -> bool:
+    """Same items in any order (e.g. the indices of two sum)."""
+    if not isinstance(result, (list, tuple)) or not isinstance(expected, (list, tuple)):
+        return result == expected
+    if len(result) != len(expected):
+        return False
+    return _item_counts(result) == _item_counts(expected)
+
+
+def unordered_nested(result, expected, options: Dict) -> bool:
+    """Same groups in any order, each group in any order (e.g. group anagrams, 3sum)."""
+    if not isinstance(result, (list, tuple)) or not isinstance(expected, (list, tuple)):
+        return result == expected
+    if len(result) != len(expected):
+        return False
+    return _item_counts(list(map(_sorted_inner, result))) == _item_counts(list(map(_sorted_inner, expected)))
+
+
+def float_tolerance(result, expected, options: Dict) -> bool:
+    """Numbers equal within rel_tol/abs_tol (default 1e-5), compared item by item."""
+    if isinstance(result, (int, float)) and isinstance(expected, (int, float)) \
+            and not isinstance(result, bool) and not isinstance(expected, bool):
+        return math.isclose(result, expected,
+                            rel_tol=options.get('rel_tol', FLOAT_REL_TOL),
+                            abs_tol=options.get('abs_tol', FLOAT_ABS_TOL))
+    if isinstance(result, (list, tuple)) and isinstance(expected, (list, tuple)):
+        return len(result) == len(expected) and all(
+            float_tolerance(r, e, options) for r, e in zip(result, expected))
+    return result == expected
+
+
+def in_place(result, expected, options: Dict) -> bool:
+    """
+    The argument the solution modifies, compared exactly. The harness passes
+    that argument (see modified_argument) as the result.
+    """
+    return result == expected
+
+
+COMPARATORS: Dict[str, Callable] = {
+    'exact': exact,
+    'unordered': unordered,
+    'unordered_nested': unordered_nested,
+    'float_tolerance': float_tolerance,
+    'in_place': in_place,
+}
+
+
+def comparator_for(question: Optional[Dict]) -> Dict:
+    """
+    The comparator spec of a question, ready to send to the sandbox.
+
+    A question may set 'comparator' to a name or to a dict with a 'name' and
+    options, e.g. {"name": "float_tolerance", "abs_tol": 1e-6} or
+    {"name": "in_place", "arg": "matrix"}.
+
+    Returns:
+        {'name': ..., **options}
+    """
+    question = question or {}
+    spec = question.get('comparator') or QUESTION_COMPARATORS.get(question.get('id'), DEFAULT_COMPARATOR)
+    if isinstance(spec, str):
+        spec = {'name': spec}
+    if spec.get('name') not in COMPARATORS:
+        print(f"⚠️  Unknown comparator {spec.get('name')!r} for {question.get('id')}, using {DEFAULT_COMPARATOR}")
+        spec = {'name': DEFAULT_COMPARATOR}
+    return dict(spec)
+
+
+def results_match(result, expected, spec: Optional[Dict] = None) -> bool:
+    """Compare a result with the expected value under a comparator spec (default exact)."""
+    spec = spec or {'name': DEFAULT_COMPARATOR}
+    try:
+        return COMPARATORS[spec['name']](result, expected, spec)
+    except Exception:
+        return result == expected
+
+
+def modified_argument(input_data, spec: Dict):
+    """
+    The argument an in-place solution changed, after the call.
+
+    spec['arg'] is a parameter name or position (default the first argument).
+    """
+    arg = spec.get('arg', 0)
+    if isinstance(input_data, dict):
+        if isinstance(arg, str):
+            return input_data.get(arg)
+        values = list(input_data.values())
+        return values[arg] if arg < len(values) else None
+    if isinstance(input_data, list):
+        return input_data[arg] if isinstance(arg, int) and arg < len(input_data) else None
+    return input_data
+
+
+def is_large(value) -> bool:
+    """Outputs too big to send back whole."""
+    return isinstance(value, (list, tuple, str)) and len(value) > DIGEST_MIN_ITEMS
+
+
+def digest(value, spec: Optional[Dict] = None) -> str:
+    """Digest of a value under a comparator: a multiset digest when order does not count."""
+    name = (spec or {}).get('name', DEFAULT_COMPARATOR)
+    if name in ('unordered', 'unordered_nested') and isinstance(value, (list, tuple)):
+        items = value if name == 'unordered' else list(map(_sorted_inner, value))
+        return multiset_digest(items)
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=repr)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def excerpt(value):
+    """The first EXCERPT_ITEMS items (or characters) of a large value."""
+    return list(value[:EXCERPT_ITEMS]) if isinstance(value, (list, tuple)) else value[:EXCERPT_ITEMS]
+
+
+def diff_excerpt(result, expected, spec: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    A small description of where a result and the expected value differ.
+
+    Ordered comparators give the first differing index with a few items of
+    context; unordered ones give a few missing and unexpected items.
+    """
+    if not isinstance(result, (list, tuple, str)) or not isinstance(expected, (list, tuple, str)):
+        return None
+    name = (spec or {}).get('name', DEFAULT_COMPARATOR)
+    diff = {'output_length': len(result), 'expected_length': len(expected)}
+
+    if name in ('unordered', 'unordered_nested') and isinstance(result, (list, tuple)) \
+            and isinstance(expected, (list, tuple)):
+        if name == 'unordered_nested':
+            result, expected = map(_sorted_inner, result), map(_sorted_inner, expected)
+        result_counts, expected_counts = _item_counts(list(result)), _item_counts(list(expected))
+        diff['missing'] = [_plain(item) for item in islice((expected_counts - result_counts).elements(), DIFF_ITEMS)]
+        diff['unexpected'] = [_plain(item) for item in islice((result_counts - expected_counts).elements(), DIFF_ITEMS)]
+        return diff
+
+    index = next((i for i, (r, e) in enumerate(zip(result, expected))
+                  if not results_match(r, e, spec)), min(len(result), len(expected)))
+    start = max(0, index - DIFF_CONTEXT)
+    end = index + DIFF_CONTEXT + 1
+    diff.update(index=index, start=start, output=result[start:end], expected=expected[start:end])
+    return diff
+
+
+def compact_result(result: Dict, spec: Optional[Dict] = None) -> Dict:
+    """
+    Replace a test result's large output and expected value with digests and
+    excerpts, adding a diff excerpt when they differ. Small results are
+    returned unchanged.
+    """
+    output, expected = result.get('output'), result.get('expected')
+    if not (is_large(output) or is_large(expected)):
+        return result
+    if not result.get('passed') and expected is not None:
+        result['diff'] = diff_excerpt(output, expected, spec)
+    for field, value in (('output', output), ('expected', expected)):
+        if is_large(value):
+            result[field] = excerpt(value)
+            result[f'{field}_length'] = len(value)
+            result[f'{field}_digest'] = digest(value, spec)
+    return result
@@ -0,0 +1,160 @@
+"""
+Empirical time-complexity estimation.
+Fits (input size, runtime) samples to the common complexity classes and
+compares the best fit with the knowledge base's expected complexity.
+"""
+import math
+import re
+from typing import Dict, List, Optional
+
+# Ordered from fastest to slowest growth
+COMPLEXITY_CLASSES = [
+    ('O(1)', lambda n: 0.0),
+    ('O(log n)', lambda n: math.log2(n)),
+    ('O(n)', lambda n: float(n)),
+    ('O(n log n)', lambda n: n * math.log2(n)),
+    ('O(n^2)', lambda n: float(n) * n),
+]
+
+# Classes that timings cannot reliably tell apart (log factors drown in noise,
+# interpreter overhead and cache effects), compared as one group in verdicts
+CLASS_GROUP = {'O(1)': 0, 'O(log n)': 0, 'O(n)': 1, 'O(n log n)': 1, 'O(n^2)': 2}
+
+# Input sizes probed, in half-decade steps from 10^2 to 10^5
+PROBE_SIZES = [100, 300, 1000, 3000, 10000, 30000, 100000]
+
+# A simpler class wins unless the more complex one fits clearly better
+SIMPLER_CLASS_TOLERANCE = 1.25
+
+# If even the largest input runs faster than this (seconds), timings are all overhead
+CONSTANT_TIME_FLOOR = 5e-5
+
+# Above this RMS relative error even the best fit explains the timings too poorly to name a class
+MAX_FIT_ERROR = 0.3
+
+
+def parse_complexity(text: str) -> Optional[str]:
+    """
+    Map a complexity string such as 'O(n²)' or 'O(max(m,n))' to a class name.
+
+    Returns:
+        A COMPLEXITY_CLASSES name, or None if the string is not one of them
+    """
+    if not text:
+        return None
+    expr = text.strip().lower().replace('²', '^2').replace(' ', '')
+    match = re.fullmatch(r'o\((.*)\)', expr)
+    if not match:
+        return None
+    expr = match.group(1).replace('·', '*')
+    # Several size variables (m, n, k, ...) are treated as one input size n
+    expr = re.sub(r'max\(([a-z]),([a-z])\)', 'n', expr)
+    expr = re.sub(r'\b[a-z]\+[a-z]\b', 'n', expr)
+    expr = re.sub(r'\b[mk]\b', 'n', expr)
+
+    if expr == '1':
+        return 'O(1)'
+    if expr in ('logn', 'log(n)'):
+        return 'O(log n)'
+    if expr == 'n':
+        return 'O(n)'
+    if expr in ('nlogn', 'n*logn', 'nlog(n)', 'n*log(n)'):
+        return 'O(n log n)'
+    if expr in ('n^2', 'n*n'):
+        return 'O(n^2)'
+    return None
+
+
+def _fit(samples: List[Dict], model) -> float:
+    """
+    Weighted least squares of t = a*f(n) + b with a >= 0.
+
+    Residuals are relative to each runtime so small inputs count as much as
+    large ones. Returns the RMS relative error.
+    """
+    xs = [model(s['n']) for s in samples]
+    ts = [s['seconds'] for s in samples]
+    ws = [1.0 / (t * t) for t in ts]
+
+    sw = sum(ws)
+    swx = sum(w * x for w, x in zip(ws, xs))
+    swt = sum(w * t for w, t in zip(ws, ts))
+    swxx = sum(w * x * x for w, x in zip(ws, xs))
+    swxt = sum(w * x * t for w, x, t in zip(ws, xs, ts))
+
+    det = sw * swxx - swx * swx
+    a = (sw * swxt - swx * swt) / det if det > 0 else 0.0
+    if a <= 0:
+        a, b = 0.0, swt / sw
+    else:
+        b = (swt - a * swx) / sw
+
+    errors = [((a * x + b) - t) / t for x, t in zip(xs, ts)]
+    return math.sqrt(sum(e * e for e in errors) / len(errors))
+
+
+def fit_complexity(samples: List[Dict]) -> Dict:
+    """
+    Pick the complexity class that best explains the timings.
+
+    Args:
+        samples: [{'n': input size, 'seconds': runtime}, ...] for 3+ distinct sizes
+
+    Returns:
+        {'observed': class name or None, 'errors': {class: RMS relative error},
+        'inconclusive': True when no class fits within MAX_FIT_ERROR}
+    """
+    samples = [s for s in samples if s.get('seconds', 0) > 0]
+    if len({s['n'] for s in samples}) < 3:
+        return {'observed': None, 'errors': {}}
+
+    if max(s['seconds'] for s in samples) < CONSTANT_TIME_FLOOR:
+        return {'observed': 'O(1)', 'errors': {}}
+
+    errors = {name: _fit(samples, model) for name, model in COMPLEXITY_CLASSES}
+    best = min(errors, key=errors.get)
+    if errors[best] > MAX_FIT_ERROR:
+        return {'observed': None, 'errors': {name: round(err, 4) for name, err in errors.items()},
+                'inconclusive': True}
+    # Prefer the simplest class whose fit is nearly as good as the best
+    for name, _ in COMPLEXITY_CLASSES:
+        if errors[name] <= errors[best] * SIMPLER_CLASS_TOLERANCE:
+            best = name
+            break
+    return {'observed': best, 'errors': {name: round(err, 4) for name, err in errors.items()}}
+
+
+def compare_complexity(observed: Optional[str], expected: Optional[str]) -> str:
+    """
+    'matches', 'slower' or 'faster' than expected; 'unknown' if either is missing.
+
+    Classes in the same CLASS_GROUP match, so an O(n) solution measured as
+    O(n log n) is not reported as slower.
+    """
+    if observed not in CLASS_GROUP or expected not in CLASS_GROUP:
+        return 'unknown'
+    diff = CLASS_GROUP[observed] - CLASS_GROUP[expected]
+    if diff == 0:
+        return 'matches'
+    return 'slower' if diff > 0 else 'faster'
+
+
+def display_complexity(name: Optional[str]) -> str:
+    """Class name as shown to users (O(n²) rather than O(n^2))."""
+    return (name or '?').replace('^2', '²')
+
+
+def describe_complexity(observed: Optional[str], expected: Optional[str], verdict: str) -> str:
+    """One-line summary shown to the user."""
+    if verdict == 'inconclusive':
+        return 'The timings fit no complexity class well (too noisy or irregular); try again.'
+    if observed is None:
+        return 'Not enough timing data to estimate the complexity.'
+    looks = f'Your solution looks {display_complexity(observed)}'
+    if verdict == 'slower':
+        return f'{looks}, expected {display_complexity(expected)}.'
+    if verdict == 'matches':
+        return f'{looks}, in line with the expected {display_complexity(expected)}.'
+    if verdict == 'faster':
+        return f'{looks}, faster than the expected {display_complexity(expected)}.'
+    return f'{looks}. No expected complexity is recorded for this problem.'
@@ -0,0 +1,220 @@
+"""
+Asynchronous code execution jobs.
+Submitting a run returns a job id straight away; the sandbox run happens on a
+background thread, so no request thread waits for user code. Clients poll the
+job (or stream its results) and may cancel it, which kills the sandbox worker.
+Finished jobs are kept for a TTL and then forgotten.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from sandbox_pool import sandbox_pool, SandboxPool, SandboxBusy, SandboxCancelled
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+# A task runs the job: task(on_result, cancel) -> final response payload
+Task = Callable[[Callable[[Dict], None], threading.Event], Dict]
+
+
+class ExecutionJob:
+    """One submitted run: its state, the results streamed so far and the final response."""
+
+    def __init__(self, kind: str, owner: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.results: List[Dict] = []
+        self.response: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def add_result(self, result: Dict):
+        with self._changed:
+            self.results.append(result)
+            self._changed.notify_all()
+
+    def set_status(self, status: str, response: Dict = None, error: str = None):
+        with self._changed:
+            if self.finished:
+                return
+            self.status = status
+            if status == RUNNING:
+                self.started_at = time.time()
+            if status in FINISHED_STATES:
+                self.finished_at = time.time()
+                self.response = response
+                self.error = error
+            self._changed.notify_all()
+
+    def wait_for_update(self, seen: int, timeout: float) -> bool:
+        """Block until there are more than `seen` results or the job finishes; False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: len(self.results) > seen or self.finished, timeout)
+
+    def to_dict(self, since: int = 0) -> Dict:
+        """
+        Snapshot for the API.
+
+        Args:
+            since: Only include results from this index on (for incremental polling)
+        """
+        with self._changed:
+            data = {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'results_count': len(self.results),
+                'results': self.results[since:],
+                'response': self.response
+            }
+            if self.error:
+                data['error'] = self.error
+            return data
+
+
+class ExecutionJobManager:
+    """Runs jobs on background threads and keeps them for polling until they expire."""
+
+    def __init__(self, pool: SandboxPool = sandbox_pool, ttl_seconds: float = 300,
+                 max_jobs: int = 1000, max_pending: int = None):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self.max_jobs = max_jobs
+        self._max_pending = max_pending
+        self._jobs: OrderedDict = OrderedDict()  # job id -> ExecutionJob, oldest first
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.expired = 0
+
+    @property
+    def max_pending(self) -> int:
+        """Unfinished jobs allowed at once; by default what the pool can run plus queue."""
+        if self._max_pending is not None:
+            return self._max_pending
+        return self.pool.size + self.pool.max_waiting
+
+    def submit(self, task: Task, kind: str = 'run', owner: str = None) -> ExecutionJob:
+        """
+        Start a job in the background and return it immediately.
+
+        Args:
+            task: task(on_result, cancel) runs the sandbox and returns the final response
+            kind: Label reported back to clients ('run', 'execute', ...)
+            owner: User the job belongs to; other users cannot see or cancel it
+
+        Raises:
+            SandboxBusy: too many unfinished jobs
+        """
+        with self._lock:
+            self._prune()
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise SandboxBusy('Too many execution jobs are already queued')
+            job = ExecutionJob(kind, owner)
+            self._jobs[job.id] = job
+            self.submitted += 1
+
+        thread = threading.Thread(target=self._run, args=(job, task),
+                                  name=f'execution-job-{job.id[:8]}', daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: ExecutionJob, task: Task):
+        if job.cancel_event.is_set():
+            job.set_status(CANCELLED)
+            return
+        job.set_status(RUNNING)
+        try:
+            response = task(job.add_result, job.cancel_event)
+            job.set_status(DONE, response=response)
+        except SandboxCancelled:
+            job.set_status(CANCELLED)
+        except SandboxBusy as e:
+            job.set_status(FAILED, error=f'The code runner is busy right now ({e}). Please try again.')
+        except Exception as e:
+            print(f"⚠️  Execution job {job.id} failed: {e}")
+            job.set_status(FAILED, error=f'Execution error: {str(e)}')
+
+    def get(self, job_id: str, owner: str = None) -> Optional[ExecutionJob]:
+        """The job, or None if it does not exist, has expired or belongs to someone else."""
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(job_id)
+        if job is None or job.owner != owner:
+            return None
+        return job
+
+    def cancel(self, job_id: str, owner: str = None) -> Optional[ExecutionJob]:
+        """
+        Cancel a queued or running job. The sandbox running it is killed and
+        replaced; cancelling a finished job has no effect.
+        """
+        job = self.get(job_id, owner)
+        if job is not None and not job.finished:
+            job.cancel_event.set()
+            self.cancelled += 1
+        return job
+
+    def _prune(self):
+        """Drop finished jobs past their TTL, then the oldest finished ones beyond max_jobs."""
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and now - job.finished_at > self.ttl_seconds:
+                del self._jobs[job_id]
+                self.expired += 1
+        if len(self._jobs) > self.max_jobs:
+            for job_id, job in list(self._jobs.items()):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if job.finished:
+                    del self._jobs[job_id]
+                    self.expired += 1
+
+    def reset_after_fork(self):
+        """Forget the parent's jobs in a freshly forked server process; their threads did not survive the fork."""
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._prune()
+            states = [job.status for job in self._jobs.values()]
+        return {
+            'jobs': len(states),
+            'queued': states.count(QUEUED),
+            'running': states.count(RUNNING),
+            'max_pending': self.max_pending,
+            'ttl_seconds': self.ttl_seconds,
+            'submitted': self.submitted,
+            'rejected': self.rejected,
+            'cancelled': self.cancelled,
+            'expired': self.expired
+        }
+
+
+# Global instance
+execution_jobs = ExecutionJobManager()
@@ -0,0 +1,51 @@
+"""
+Gunicorn settings for serving the IDE in production:
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+A single worker runs a thread pool (gthread). Requests mostly wait on
+sandbox subprocesses or the LLM, so threads carry the concurrency. Execution
+jobs live in the memory of the process that created them (execution_jobs),
+so a second worker would answer polls and result streams for jobs it has
+never seen; the worker count is therefore fixed at one.
+
+Environment:
+    BIND                address to listen on (default 127.0.0.1:5000)
+    WEB_THREADS         request threads (default 16)
+    SANDBOX_POOL_SIZE   sandbox workers (default: one per core)
+    PRELOAD_APP=1       import the app once in the master before forking
+    PRELOAD_LLM=1       start loading the LLM in the worker at startup
+"""
+import os
+
+bind = os.environ.get('BIND', '127.0.0.1:5000')
+workers = 1
+if int(os.environ.get('WEB_WORKERS', 1)) > 1:
+    print("⚠️  WEB_WORKERS is ignored: execution jobs are kept in one process, raise WEB_THREADS instead")
+threads = int(os.environ.get('WEB_THREADS', 16))
+worker_class = 'gthread'
+preload_app = os.environ.get('PRELOAD_APP') == '1'
+
+# Result streams and LLM hints keep requests open for a while
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# One sandbox per core unless set explicitly
+os.environ.setdefault('SANDBOX_POOL_SIZE', str(max(1, os.cpu_count() or 1)))
+
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    """Give the worker its own threads, SQLite connections, sandbox pool and model."""
+    from app import init_process
+    init_process(after_fork=True)
+    server.log.info(f"Worker {worker.pid} ready")
+
+
+def worker_exit(server, worker):
+    """Write pending progress and stop this worker's sandboxes."""
+    from progress_store import progress_store
+    from sandbox_pool import sandbox_pool
+    progress_store.flush()
+    sandbox_pool.shutdown()
@@ -0,0 +1,376 @@
+"""
+Inference service that owns the hint LLM.
+Flask request threads never call llama.cpp directly: they submit requests to a
+bounded queue served by a single worker thread, which enforces deadlines,
+stops generating for cancelled requests and coalesces identical prompts.
+"""
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+_DONE = object()
+
+
+class InferenceBusy(Exception):
+    """Raised when the request queue is full."""
+
+
+class InferenceUnavailable(Exception):
+    """Raised when no model is loaded."""
+
+
+class PrefixStateCache:
+    """
+    LRU of llama.cpp states keyed by prompt prefix, bounded by total state bytes.
+    Loading a saved state lets the model skip re-evaluating a shared prefix.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._states: OrderedDict = OrderedDict()  # prefix -> (state, size)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, prefix: str):
+        entry = self._states.get(prefix)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._states.move_to_end(prefix)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, prefix: str, state, size: int):
+        if size > self.max_bytes:
+            return
+        if prefix in self._states:
+            self.total_bytes -= self._states.pop(prefix)[1]
+        self._states[prefix] = (state, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._states.popitem(last=False)
+            self.total_bytes -= evicted_size
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self._states),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class InferenceRequest:
+    """A queued completion; iterate tokens() to receive generated text."""
+
+    def __init__(self, prompt: str, params: Dict, timeout: float, prefix: Optional[str] = None):
+        self.prompt = prompt
+        self.prefix = prefix
+        self.params = params
+        self.batch_key = (prompt, tuple(sorted(params.items())))
+        self.submitted_at = time.monotonic()
+        self.deadline = self.submitted_at + timeout
+        self.started_at = None
+        self._tokens: queue.Queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._finished = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def cancel(self):
+        """Stop waiting; the worker drops the request at its next check."""
+        self._cancelled.set()
+
+    def tokens(self):
+        """Yield text pieces until generation finishes, fails or times out."""
+        while True:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                self.cancel()
+                raise TimeoutError('LLM request exceeded its deadline')
+            try:
+                item = self._tokens.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _put(self, text: str):
+        self._tokens.put(text)
+
+    def _finish(self, error: Exception = None):
+        if not self._finished:
+            self._finished = True
+            self._tokens.put(error if error is not None else _DONE)
+
+
+class InferenceService:
+    """Single-consumer queue in front of one llama.cpp model."""
+
+    def __init__(self, max_queue: int = 16, default_timeout: float = 45):
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.llm = None
+
+        # Model loading state, reported by /api/health
+        self.load_state = 'not_loaded'  # not_loaded | loading | ready | failed
+        self.load_attempts = 0
+        self.last_load_error = None
+        self._next_load_at = 0.0
+        self._load_lock = threading.Lock()
+
+        self._pending: deque = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+
+        self.prefix_cache = PrefixStateCache()
+        self._wait_times = deque(maxlen=256)  # seconds spent queued, most recent requests
+        self.submitted = 0
+        self.completed = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.expired = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def load_model(self, model_path: str) -> bool:
+        """Load the GGUF model; returns True once a model is available."""
+        with self._load_lock:
+            if self.llm is not None:
+                return True
+            self.load_state = 'loading'
+            self.load_attempts += 1
+            try:
+                if not os.path.exists(model_path):
+                    raise FileNotFoundError(f"LLM model not found at {model_path}")
+
+                from llama_cpp import Llama
+                import platform
+
+                # Detect Apple Silicon and use Metal GPU acceleration
+                is_apple_silicon = platform.system() == 'Darwin' and platform.machine() == 'arm64'
+                gpu_layers = 28 if is_apple_silicon else 0  # Deepseek-1.3B has fewer layers
+
+                print(f"🔄 Loading Deepseek-Coder-1.3B from {model_path}...")
+                if is_apple_silicon:
+                    print(f"🚀 Apple Silicon detected! Using Metal GPU acceleration ({gpu_layers} layers)")
+
+                self.llm = Llama(
+                    model_path=model_path,
+                    n_ctx=4096,  # Deepseek supports larger context
+                    n_threads=4,
+                    n_gpu_layers=gpu_layers,  # Use Metal GPU on Apple Silicon
+                    use_mlock=True,  # Keep model in RAM for faster inference
+                    n_batch=512,  # Batch size for prompt processing
+                    logits_all=False,  # Only compute logits for last token (fixes corruption)
+                    vocab_only=False,
+                    verbose=False  # Reduce terminal spam
+                )
+                self.load_state = 'ready'
+                self.last_load_error = None
+                print("✅ LLM loaded successfully with GPU acceleration!")
+                return True
+            except Exception as e:
+                self.load_state = 'failed'
+                self.last_load_error = str(e)
+                self._next_load_at = time.monotonic() + self._retry_delay()
+                print(f"⚠️  Could not load LLM: {e}")
+                print("📝 Falling back to knowledge-base only hints")
+                return False
+
+    def _retry_delay(self) -> float:
+        """Exponential backoff between load attempts: 2s, 4s, 8s ... capped at 5 minutes."""
+        return min(300.0, 2.0 ** self.load_attempts)
+
+    def should_attempt_load(self) -> bool:
+        """True when no load is running and the backoff since the last failure has passed."""
+        return (self.llm is None and self.load_state != 'loading'
+                and time.monotonic() >= self._next_load_at)
+
+    def start_background_load(self, model_path: str, max_attempts: int = 5):
+        """Load the model on a background thread, retrying failures with backoff."""
+        def load_with_retries():
+            while not self.load_model(model_path) and self.load_attempts < max_attempts:
+                time.sleep(max(0.0, self._next_load_at - time.monotonic()))
+
+        self.load_state = 'loading'
+        threading.Thread(target=load_with_retries, name='llm-preload', daemon=True).start()
+
+    def is_ready(self) -> bool:
+        return self.llm is not None
+
+    def health(self) -> Dict:
+        retry_in = max(0.0, self._next_load_at - time.monotonic()) if self.load_state == 'failed' else 0.0
+        return {
+            'state': self.load_state,
+            'ready': self.llm is not None,
+            'attempts': self.load_attempts,
+            'last_error': self.last_load_error,
+            'retry_in_s': round(retry_in, 1)
+        }
+
+    def submit(self, prompt: str, timeout: float = None, prefix: str = None, **params) -> InferenceRequest:
+        """
+        Queue a completion request; raises InferenceBusy when the queue is full.
+
+        prefix, if given, must be the start of prompt; its evaluated state is
+        cached and restored so later prompts sharing it skip that evaluation.
+        """
+        if self.llm is None:
+            raise InferenceUnavailable('LLM is not loaded')
+
+        request = InferenceRequest(prompt, params, timeout or self.default_timeout, prefix)
+        with self._cond:
+            if len(self._pending) >= self.max_queue:
+                self.rejected += 1
+                raise InferenceBusy('LLM queue is full')
+            self._pending.append(request)
+            self.submitted += 1
+            self._ensure_worker()
+            self._cond.notify()
+        return request
+
+    def stream(self, prompt: str, timeout: float = None, prefix: str = None, **params):
+        """Submit a request and yield its text; closing the generator cancels it."""
+        request = self.submit(prompt, timeout, prefix, **params)
+        try:
+            yield from request.tokens()
+        finally:
+            request.cancel()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='llm-inference', daemon=True)
+            self._worker.start()
+
+    def _next_batch(self) -> List[InferenceRequest]:
+        """Pop the oldest request plus any queued requests with the same prompt and params."""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            first = self._pending.popleft()
+            batch = [first]
+            for request in list(self._pending):
+                if request.batch_key == first.batch_key:
+                    self._pending.remove(request)
+                    batch.append(request)
+            self.coalesced += len(batch) - 1
+            return batch
+
+    def _drop_inactive(self, requests: List[InferenceRequest]) -> List[InferenceRequest]:
+        live = []
+        for request in requests:
+            if request.cancelled:
+                self.cancelled += 1
+                request._finish()
+            elif request.expired:
+                self.expired += 1
+                request._finish(TimeoutError('LLM request exceeded its deadline'))
+            else:
+                live.append(request)
+        return live
+
+    def _run(self):
+        while True:
+            batch = self._drop_inactive(self._next_batch())
+            if not batch:
+                continue
+
+            now = time.monotonic()
+            for request in batch:
+                request.started_at = now
+                self._wait_times.append(now - request.submitted_at)
+
+            leader = batch[0]
+            try:
+                self._restore_prefix(leader.prefix)
+                for chunk in self.llm(leader.prompt, stream=True, **leader.params):
+                    batch = self._drop_inactive(batch)
+                    if not batch:
+                        break  # Nobody is listening any more: stop generating
+                    text = chunk['choices'][0]['text']
+                    if text:
+                        for request in batch:
+                            request._put(text)
+                for request in batch:
+                    request._finish()
+                    self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                for request in batch:
+                    request._finish(e)
+
+    def _restore_prefix(self, prefix: Optional[str]):
+        """
+        Put the model in the state right after evaluating prefix.
+
+        On a hit the cached state is loaded; on a miss the prefix is evaluated
+        once and its state saved. llama.cpp then matches the loaded tokens
+        against the full prompt and only evaluates the remaining tail.
+        """
+        if not prefix or not hasattr(self.llm, 'save_state'):
+            return
+        state = self.prefix_cache.get(prefix)
+        if state is not None:
+            self.llm.load_state(state)
+            return
+        tokens = self.llm.tokenize(prefix.encode('utf-8'))
+        self.llm.reset()
+        self.llm.eval(tokens)
+        state = self.llm.save_state()
+        self.prefix_cache.put(prefix, state, getattr(state, 'llama_state_size', 0))
+
+    def reset_after_fork(self):
+        """
+        Start unloaded in a freshly forked server process. llama.cpp's threads
+        and saved states do not survive a fork, so each process loads its own model.
+        """
+        self.llm = None
+        self.load_state = 'not_loaded'
+        self.load_attempts = 0
+        self.last_load_error = None
+        self._next_load_at = 0.0
+        self._load_lock = threading.Lock()
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._worker = None
+        self.prefix_cache = PrefixStateCache(self.prefix_cache.max_bytes)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            depth = len(self._pending)
+        waits = sorted(self._wait_times)
+        return {
+            'model_loaded': self.llm is not None,
+            'queue_depth': depth,
+            'max_queue': self.max_queue,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'coalesced': self.coalesced,
+            'cancelled': self.cancelled,
+            'expired': self.expired,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'prefix_cache': self.prefix_cache.stats(),
+            'wait_ms_avg': round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+            'wait_ms_p50': round(1000 * waits[len(waits) // 2], 1) if waits else 0.0,
+            'wait_ms_p95': round(1000 * waits[int(len(waits) * 0.95)], 1) if waits else 0.0,
+            'wait_ms_max': round(1000 * waits[-1], 1) if waits else 0.0
+        }
@@ -0,0 +1,409 @@
+"""
+Deterministic input generators for scaled test runs.
+A schema maps each parameter of the entry point to a spec describing what to
+generate; specs are plain JSON so jobs can carry them to the sandbox, which
+builds the (possibly large) inputs itself from a seed.
+"""
+import math
+import random
+import string
+from collections import Counter
+from typing import Dict, List
+
+# Parameter names -> kind of input, following LeetCode naming
+INT_LIST_PARAMS = {'nums', 'arr', 'array', 'numbers', 'height', 'heights', 'prices',
+                   'temperatures', 'coins', 'candidates', 'stones', 'weights'}
+NON_NEGATIVE_PARAMS = {'height', 'heights', 'prices', 'temperatures', 'coins', 'candidates',
+                       'stones', 'weights'}
+STRING_PARAMS = {'s', 't', 'word', 'text', 'string', 'pattern', 'digits', 's1', 's2',
+                 'text1', 'text2', 'beginWord', 'endWord'}
+STRING_LIST_PARAMS = {'strs', 'words', 'wordDict', 'wordList'}
+SIZE_PARAMS = {'n', 'm', 'numCourses', 'amount', 'rows', 'cols'}
+SCALAR_PARAMS = {'target', 'k', 'val', 'x'}
+# Scalars looked up in the data: an unreachable value forces a full search (worst case)
+ABSENT_SCALAR_PARAMS = {'target'}
+GRID_PARAMS = {'grid', 'matrix'}
+INTERVAL_LIST_PARAMS = {'intervals'}
+INTERVAL_PARAMS = {'newInterval'}
+EDGE_LIST_PARAMS = {'edges', 'prerequisites'}
+
+# Per-question specs that beat the name heuristics (e.g. 'heights' is a grid here),
+# mostly to stay within the problem's constraints and guarantees (two sum has an
+# answer, missing number misses exactly one value, coin change has at most 12 coins)
+# or to make the data a worst case (contains duplicate, palindrome and bracket
+# checks scan the whole input instead of stopping at the first mismatch). A spec's
+# 'typical' overrides give the everyday data used alongside it (see typical_schema).
+# A question may also carry its own 'input_schema' with the same shape.
+QUESTION_SCHEMAS = {
+    'pacific_atlantic_water_flow': {'heights': {'kind': 'grid', 'values': list(range(10))}},
+    'two_sum': {'nums': {'kind': 'int_list', 'low': -10 ** 9, 'high': 10 ** 9, 'min_n': 2},
+                'target': {'kind': 'pair_sum', 'guarantee': 'one_pair_sum'}},
+    'minimum_window_substring': {'t': {'kind': 'string', 'charset': string.ascii_lowercase,
+                                       'guarantee': 'unique_min_window'}},
+    'missing_number': {'nums': {'kind': 'int_list', 'order': 'missing_one'}},
+    'contains_duplicate': {'nums': {'kind': 'int_list', 'low': -10 ** 9, 'high': 10 ** 9, 'order': 'distinct',
+                                    'typical': {'low': -10 ** 4, 'high': 10 ** 4}}},
+    'valid_palindrome': {'s': {'kind': 'string', 'charset': string.ascii_lowercase, 'order': 'palindrome'}},
+    'valid_parentheses': {'s': {'kind': 'string', 'charset': '()[]{}', 'order': 'balanced'}},
+    'coin_change': {'coins': {'kind': 'int_list', 'low': 1, 'high': 100, 'max_n': 12}},
+    'word_break': {'s': {'kind': 'string', 'charset': 'abcde'}},
+    'maximum_product_subarray': {'nums': {'kind': 'int_list', 'low': -2, 'high': 2}},
+    'house_robber': {'nums': {'kind': 'int_list', 'low': 0, 'high': 400}},
+}
+
+# Largest n per question, from its LeetCode constraints (grids count cells).
+# Beyond them even the reference solution can run out of time, e.g. the O(n²)
+# longest increasing subsequence at n=60000.
+QUESTION_MAX_SIZES = {
+    'valid_palindrome': 200000, 'move_zeroes': 10000, 'two_sum': 10000,
+    'contains_duplicate': 100000, 'valid_anagram': 50000, 'maximum_subarray': 100000,
+    'best_time_to_buy_sell_stock': 100000, 'missing_number': 10000, 'valid_parentheses': 10000,
+    '3sum': 3000, 'longest_substring_no_repeat': 50000, 'container_with_most_water': 100000,
+    'longest_repeating_char_replace': 100000, 'group_anagrams': 10000,
+    'minimum_window_substring': 100000, 'find_min_rotated_sorted_array': 5000,
+    'search_rotated_sorted_array': 5000, 'number_of_islands': 90000, 'course_schedule': 2000,
+    'pacific_atlantic_water_flow': 40000, 'graph_valid_tree': 2000,
+    'number_of_connected_components': 2000, 'climbing_stairs': 45, 'house_robber': 100,
+    'unique_paths': 100, 'coin_change': 10000, 'longest_increasing_subsequence': 2500,
+    'decode_ways': 100, 'word_break': 300, 'longest_palindromic_substring': 1000,
+    'palindromic_substrings': 1000, 'maximum_product_subarray': 20000, 'rotate_image': 400,
+    'spiral_matrix': 100, 'set_matrix_zeroes': 40000, 'merge_intervals': 10000,
+    'insert_interval': 10000, 'encode_decode_strings': 200,
+}
+DEFAULT_MAX_SIZE = 100000
+
+# Node-based or structured inputs the generators cannot build from a size
+UNSUPPORTED_PARAMS = {'root', 'head', 'headA', 'headB', 'l1', 'l2', 'list1', 'list2',
+                      'lists', 'p', 'q', 'subRoot', 'node', 'preorder', 'inorder',
+                      'board', 'tokens'}
+
+# Substrings of a question title that constrain the generated data
+SORTED_TITLES = ('sorted', 'binary search')
+ROTATED_TITLES = ('rotated',)
+PARENTHESES_TITLES = ('parenthes',)
+DIGIT_TITLES = ('decode',)
+
+PLACEHOLDER_STRINGS = {'test', 'example', 'input', ''}
+
+# Fuzzing draws values from small ranges so duplicates, ties and zeros are common
+FUZZ_VALUE_RANGE = 10
+
+# Orders that only make worst-case data (every answer the same); typical_schema drops them
+WORST_CASE_ORDERS = {'distinct', 'palindrome', 'balanced'}
+
+BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}'}
+
+# Draws of an input whose guarantee fails before generate_input gives up
+GUARANTEE_ATTEMPTS = 20
+
+
+class GuaranteeNotMet(ValueError):
+    """Raised when no draw of an input kept its question's guarantee."""
+
+
+def _spec_from_sample(value) -> Dict:
+    """Fall back to the type of an example value when the name is not recognised."""
+    if isinstance(value, bool):
+        return {'kind': 'unsupported'}
+    if isinstance(value, int):
+        return {'kind': 'scalar'}
+    if isinstance(value, str) and value not in PLACEHOLDER_STRINGS:
+        return {'kind': 'string', 'charset': string.ascii_lowercase}
+    if isinstance(value, list) and value and all(isinstance(v, int) for v in value):
+        return {'kind': 'int_list', 'low': -10 ** 4, 'high': 10 ** 4}
+    if isinstance(value, list) and value and all(isinstance(v, list) for v in value):
+        return {'kind': 'grid', 'values': [0, 1]}
+    return {'kind': 'unsupported'}
+
+
+def infer_schema(params: List[str], question: Dict = None) -> Dict[str, Dict]:
+    """
+    Build a generation spec for every parameter of the entry point.
+
+    A question's 'input_schema' (or its QUESTION_SCHEMAS entry) decides
+    first, then a list-of-lists example value (always a grid), then names
+    (the question bank's examples are often placeholders), then the type of
+    the first test case's value. The question title adds constraints such
+    as sorted or rotated arrays.
+
+    Returns:
+        {param: spec}; spec['kind'] is 'unsupported' for inputs that cannot be generated
+    """
+    question = question or {}
+    title = (question.get('title') or '').lower()
+    sample = {}
+    for test_case in question.get('test_cases', [])[:1]:
+        if isinstance(test_case.get('input'), dict):
+            sample = test_case['input']
+
+    overrides = question.get('input_schema') or QUESTION_SCHEMAS.get(question.get('id'), {})
+    schema = {}
+    for param in params:
+        value = sample.get(param)
+        if param in overrides:
+            spec = dict(overrides[param])
+        elif isinstance(value, list) and value and all(isinstance(v, list) for v in value):
+            spec = _spec_from_sample(value)
+        elif param in UNSUPPORTED_PARAMS:
+            spec = {'kind': 'unsupported'}
+        elif param in INT_LIST_PARAMS:
+            low = 1 if param in NON_NEGATIVE_PARAMS else -10 ** 4
+            spec = {'kind': 'int_list', 'low': low, 'high': 10 ** 4}
+            if any(word in title for word in ROTATED_TITLES):
+                spec['order'] = 'rotated'
+            elif any(word in title for word in SORTED_TITLES):
+                spec['order'] = 'sorted'
+        elif param in STRING_PARAMS:
+            charset = string.ascii_lowercase
+            if any(word in title for word in PARENTHESES_TITLES):
+                charset = '()[]{}'
+            elif any(word in title for word in DIGIT_TITLES) or param == 'digits':
+                charset = '123456789'
+            spec = {'kind': 'string', 'charset': charset}
+        elif param in STRING_LIST_PARAMS:
+            spec = {'kind': 'string_list'}
+        elif param in SIZE_PARAMS:
+            spec = {'kind': 'size'}
+        elif param in SCALAR_PARAMS:
+            spec = {'kind': 'scalar', 'absent': param in ABSENT_SCALAR_PARAMS}
+        elif param in GRID_PARAMS:
+            spec = {'kind': 'grid', 'values': [0, 1] if param == 'grid' else list(range(-9, 10))}
+        elif param in INTERVAL_LIST_PARAMS:
+            spec = {'kind': 'interval_list'}
+        elif param in INTERVAL_PARAMS:
+            spec = {'kind': 'interval'}
+        elif param in EDGE_LIST_PARAMS:
+            spec = {'kind': 'edge_list'}
+        else:
+            spec = _spec_from_sample(value)
+        schema[param] = spec
+    return schema
+
+
+def max_size(question: Dict = None) -> int:
+    """Largest n to generate for a question: its own 'max_size', else its LeetCode constraint."""
+    question = question or {}
+    return question.get('max_size') or QUESTION_MAX_SIZES.get(question.get('id'), DEFAULT_MAX_SIZE)
+
+
+def unsupported_params(schema: Dict[str, Dict]) -> List[str]:
+    """Parameters the generators cannot produce."""
+    return [param for param, spec in schema.items() if spec.get('kind') == 'unsupported']
+
+
+def is_scalable(schema: Dict[str, Dict]) -> bool:
+    """True when every parameter can be generated and at least one grows with n."""
+    kinds = {spec.get('kind') for spec in schema.values()}
+    return bool(schema) and 'unsupported' not in kinds and bool(kinds - {'scalar'})
+
+
+def _int_list(rng: random.Random, spec: Dict, n: int) -> List[int]:
+    low, high = spec.get('low', -10 ** 4), spec.get('high', 10 ** 4)
+    order = spec.get('order')
+    if order == 'missing_one':
+        # n distinct numbers from 0..n with one of them left out
+        values = list(range(n + 1))
+        values.pop(rng.randrange(n + 1))
+        rng.shuffle(values)
+        return values
+    if order in ('sorted', 'rotated', 'distinct'):
+        # Distinct values so binary-search problems have a unique answer
+        # (and duplicate checks cannot stop early)
+        span = max(high - low, 2 * n)
+        values = rng.sample(range(low, low + span), n)
+        if order == 'distinct':
+            return values
+        values.sort()
+        if order == 'rotated' and n > 1:
+            pivot = rng.randrange(n)
+            values = values[pivot:] + values[:pivot]
+        return values
+    return [rng.randint(low, high) for _ in range(n)]
+
+
+def _string(rng: random.Random, spec: Dict, n: int) -> str:
+    charset = spec.get('charset', string.ascii_lowercase)
+    order = spec.get('order')
+    if order == 'palindrome':
+        half = ''.join(rng.choice(charset) for _ in range(n // 2))
+        return half + (rng.choice(charset) if n % 2 else '') + half[::-1]
+    if order == 'balanced':
+        # A random well-nested bracket string of even length
+        opens = [char for char in charset if char in BRACKET_PAIRS] or ['(']
+        chars, stack = [], []
+        length = n - n % 2
+        for i in range(length):
+            if stack and (length - i == len(stack) or rng.random() < 0.5):
+                chars.append(BRACKET_PAIRS[stack.pop()])
+            else:
+                stack.append(rng.choice(opens))
+                chars.append(stack[-1])
+        return ''.join(chars)
+    return ''.join(rng.choice(charset) for _ in range(n))
+
+
+def _pair_sum(rng: random.Random, spec: Dict, previous: Dict) -> int:
+    """
+    A target two items of the list generated before it add up to: the last
+    two (the worst case for a scan), or a random pair with spec['pair'] = 'random'.
+    """
+    items = next((value for value in previous.values() if isinstance(value, list)), [])
+    if len(items) < 2:
+        return 0
+    if spec.get('pair') == 'random':
+        i, j = rng.sample(range(len(items)), 2)
+    else:
+        i, j = len(items) - 2, len(items) - 1
+    return items[i] + items[j]
+
+
+def generate_value(rng: random.Random, spec: Dict, n: int, previous: Dict = None):
+    """
+    One parameter value of size n, kept within spec['min_n']..spec['max_n'].
+    previous holds the parameters generated before it (for targets derived from the data).
+    """
+    kind = spec.get('kind')
+    n = max(spec.get('min_n', 0), min(n, spec.get('max_n', n)))
+    if kind == 'pair_sum':
+        return _pair_sum(rng, spec, previous or {})
+    if kind == 'int_list':
+        return _int_list(rng, spec, n)
+    if kind == 'string':
+        return _string(rng, spec, n)
+    if kind == 'string_list':
+        alphabet = 'abcde'  # Small alphabet so anagrams and shared prefixes occur
+        return [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 6))) for _ in range(n)]
+    if kind == 'size':
+        return n
+    if kind == 'scalar':
+        if spec.get('absent'):
+            return 10 ** 9
+        if 'low' in spec:
+            return rng.randint(spec['low'], spec['high'])
+        return rng.randint(1, max(1, n // spec.get('divisor', 10)))
+    if kind == 'grid':
+        side = max(1, int(math.isqrt(n)))
+        values = spec.get('values', [0, 1])
+        return [[rng.choice(values) for _ in range(side)] for _ in range(side)]
+    if kind == 'interval_list':
+        intervals, start = [], 0
+        for _ in range(n):
+            start += rng.randint(1, 5)
+            end = start + rng.randint(0, 5)
+            intervals.append([start, end])
+            start = end
+        return intervals
+    if kind == 'interval':
+        start = rng.randint(0, 5 * n)
+        return [start, start + rng.randint(0, 5 * n)]
+    if kind == 'edge_list':
+        # A random tree over n nodes: connected and acyclic
+        return [[node, rng.randrange(node)] for node in range(1, n)]
+    raise ValueError(f"Cannot generate inputs of kind {kind!r}")
+
+
+def typical_schema(schema: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    The schema without worst-case orders, and with each spec's 'typical'
+    overrides applied, so answers vary (duplicates do occur, ...).
+    """
+    typical = {}
+    for param, spec in schema.items():
+        spec = {key: value for key, value in spec.items()
+                if key != 'typical' and not (key == 'order' and value in WORST_CASE_ORDERS)}
+        spec.update(schema[param].get('typical', {}))
+        typical[param] = spec
+    return typical
+
+
+def fuzz_schema(schema: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    Variant of a schema for differential fuzzing: small value ranges (with
+    repeats allowed) instead of worst-case data, looked-up scalars (target) that may or may not be present,
+    and pair-sum targets from a random pair.
+    """
+    fuzzed = {}
+    for param, spec in typical_schema(schema).items():
+        spec = dict(spec)
+        kind = spec.get('kind')
+        if kind == 'int_list':
+            spec['low'] = max(spec.get('low', -10 ** 4), -FUZZ_VALUE_RANGE)
+            spec['high'] = min(spec.get('high', 10 ** 4), FUZZ_VALUE_RANGE)
+        elif kind == 'pair_sum':
+            spec['pair'] = 'random'
+        elif kind == 'scalar' and spec.get('absent'):
+            spec['absent'] = False
+            spec['low'], spec['high'] = -2 * FUZZ_VALUE_RANGE, 2 * FUZZ_VALUE_RANGE
+        elif kind == 'scalar':
+            spec['divisor'] = 1
+        elif kind == 'grid' and len(spec.get('values', [])) > 2 * FUZZ_VALUE_RANGE:
+            spec['values'] = list(range(-FUZZ_VALUE_RANGE, FUZZ_VALUE_RANGE + 1))
+        fuzzed[param] = spec
+    return fuzzed
+
+
+def _one_pair_sum(nums, target) -> bool:
+    """Exactly one pair of positions adds up to target (two sum's guarantee)."""
+    pairs = 0
+    seen = Counter()
+    for value in nums:
+        pairs += seen[target - value]
+        seen[value] += 1
+    return pairs == 1
+
+
+def _unique_min_window(s, t) -> bool:
+    """At most one shortest window of s holds every character of t (minimum window's guarantee)."""
+    if not t:
+        return True
+    need = Counter(t)
+    missing = len(t)
+    left = 0
+    best, count = None, 0
+    for right, char in enumerate(s):
+        if need[char] > 0:
+            missing -= 1
+        need[char] -= 1
+        if missing:
+            continue
+        # The tightest window ending here, then drop its first needed character
+        while need[s[left]] < 0:
+            need[s[left]] += 1
+            left += 1
+        length = right - left + 1
+        if best is None or length < best:
+            best, count = length, 1
+        elif length == best:
+            count += 1
+        need[s[left]] += 1
+        missing += 1
+        left += 1
+    return count <= 1
+
+
+# Checks named by a spec's 'guarantee', called with the input's values in parameter order
+GUARANTEES = {
+    'one_pair_sum': _one_pair_sum,
+    'unique_min_window': _unique_min_window,
+}
+
+
+def generate_input(schema: Dict[str, Dict], n: int, seed: int = 0) -> Dict:
+    """
+    Keyword arguments of size n; the same seed always yields the same input.
+
+    When a spec names a 'guarantee' (e.g. two sum has exactly one answer),
+    inputs breaking it are redrawn, up to GUARANTEE_ATTEMPTS times.
+
+    Raises:
+        GuaranteeNotMet: no draw kept the guarantee
+    """
+    check = next((GUARANTEES[spec['guarantee']] for spec in schema.values() if spec.get('guarantee')), None)
+    for attempt in range(GUARANTEE_ATTEMPTS if check else 1):
+        rng = random.Random(f"{seed}:{n}" if attempt == 0 else f"{seed}:{n}:{attempt}")
+        values = {}
+        for param, spec in schema.items():
+            values[param] = generate_value(rng, spec, n, values)
+        if check is None or check(*values.values()):
+            return values
+    raise GuaranteeNotMet(f"No input of size {n} kept the question's guarantee")
@@ -0,0 +1,70 @@
+"""
+Length-prefixed frames for the sandbox result channel.
+Each frame is a 4-byte big-endian payload length, a 1-byte flags field and
+a JSON payload, zlib-compressed when large. Frames travel on a dedicated pipe,
+so nothing user code prints can be mistaken for a result.
+"""
+import json
+import struct
+import zlib
+from typing import Dict, List
+
+HEADER = struct.Struct('>IB')
+FLAG_ZLIB = 0x01
+
+# Payloads above this size are compressed (JSON of large arrays shrinks well)
+COMPRESS_THRESHOLD = 4096
+# Anything larger is treated as a protocol error rather than buffered
+MAX_FRAME_BYTES = 32 * 1024 * 1024
+
+
+class FrameError(Exception):
+    """Raised on a malformed or oversized frame."""
+
+
+def encode_frame(message: Dict) -> bytes:
+    """Serialize one message; values JSON cannot represent are sent as str()."""
+    payload = json.dumps(message, default=str, separators=(',', ':')).encode('utf-8')
+    flags = 0
+    if len(payload) > COMPRESS_THRESHOLD:
+        compressed = zlib.compress(payload, 1)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, FLAG_ZLIB
+    if len(payload) > MAX_FRAME_BYTES:
+        raise FrameError(f'Frame of {len(payload)} bytes exceeds the {MAX_FRAME_BYTES} byte limit')
+    return HEADER.pack(len(payload), flags) + payload
+
+
+class FrameDecoder:
+    """Incremental decoder: feed bytes as they arrive, get back complete messages."""
+
+    def __init__(self, max_frame_bytes: int = MAX_FRAME_BYTES):
+        self.max_frame_bytes = max_frame_bytes
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict]:
+        self._buffer.extend(data)
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            length, flags = HEADER.unpack_from(self._buffer)
+            if length > self.max_frame_bytes:
+                raise FrameError(f'Frame of {length} bytes exceeds the {self.max_frame_bytes} byte limit')
+            end = HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[HEADER.size:end])
+            del self._buffer[:end]
+            if flags & FLAG_ZLIB:
+                # Bound the decompressed size too, so a tiny frame cannot inflate without limit
+                decompressor = zlib.decompressobj()
+                payload = decompressor.decompress(payload, self.max_frame_bytes)
+                if decompressor.unconsumed_tail:
+                    raise FrameError(f'Decompressed frame exceeds the {self.max_frame_bytes} byte limit')
+            try:
+                messages.append(json.loads(payload))
+            except ValueError as e:
+                raise FrameError(f'Undecodable frame: {e}')
+        return messages
+
+    def reset(self):
+        self._buffer.clear()
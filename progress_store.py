@@ -0,0 +1,165 @@
+"""
+Per-user progress store backed by SQLite.
+Updates are coalesced in memory and written behind in small batches, one row
+per (user, question), so the question bank itself is never rewritten.
+"""
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+PROGRESS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'progress.db')
+DEFAULT_USER = 'default'
+
+
+class ProgressStore:
+    """Write-behind progress store keyed by user and question."""
+
+    def __init__(self, path: str = PROGRESS_DB, flush_interval: float = 2.0, max_pending: int = 200):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: Dict[Tuple[str, str], Dict] = {}
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._wakeup = threading.Event()
+        self._flusher = None
+
+        self.updates_received = 0
+        self.rows_written = 0
+        self.flushes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS progress ('
+                ' user_id TEXT NOT NULL,'
+                ' question_id TEXT NOT NULL,'
+                ' data TEXT NOT NULL,'
+                ' updated_at REAL NOT NULL,'
+                ' PRIMARY KEY (user_id, question_id))'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._flush_loop, name='progress-flusher', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  Progress flush failed: {e}")
+
+    def update(self, user_id: str, question_id: str, data: Dict):
+        """Merge a partial progress update; it reaches disk on the next flush."""
+        key = (user_id or DEFAULT_USER, question_id)
+        with self._pending_lock:
+            self._pending.setdefault(key, {}).update(data)
+            self.updates_received += 1
+            backlog = len(self._pending)
+
+        self._ensure_flusher()
+        if backlog >= self.max_pending:
+            self._wakeup.set()
+
+    def get(self, user_id: str, question_id: str) -> Dict:
+        """Return the merged progress for one question (disk + pending)."""
+        key = (user_id or DEFAULT_USER, question_id)
+        with self._db_lock:
+            row = self._connect().execute(
+                'SELECT data FROM progress WHERE user_id = ? AND question_id = ?', key
+            ).fetchone()
+        progress = json.loads(row[0]) if row else {}
+        with self._pending_lock:
+            progress.update(self._pending.get(key, {}))
+        return progress
+
+    def get_user(self, user_id: str) -> Dict[str, Dict]:
+        """Return progress for every question the user has touched."""
+        user_id = user_id or DEFAULT_USER
+        with self._db_lock:
+            rows = self._connect().execute(
+                'SELECT question_id, data FROM progress WHERE user_id = ?', (user_id,)
+            ).fetchall()
+        progress = {question_id: json.loads(data) for question_id, data in rows}
+        with self._pending_lock:
+            for (pending_user, question_id), data in self._pending.items():
+                if pending_user == user_id:
+                    progress.setdefault(question_id, {}).update(data)
+        return progress
+
+    def flush(self):
+        """Write all coalesced updates in a single transaction."""
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+
+        now = time.time()
+        with self._db_lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    for (user_id, question_id), data in batch.items():
+                        row = conn.execute(
+                            'SELECT data FROM progress WHERE user_id = ? AND question_id = ?',
+                            (user_id, question_id)
+                        ).fetchone()
+                        merged = json.loads(row[0]) if row else {}
+                        merged.update(data)
+                        conn.execute(
+                            'INSERT OR REPLACE INTO progress (user_id, question_id, data, updated_at) '
+                            'VALUES (?, ?, ?, ?)',
+                            (user_id, question_id, json.dumps(merged), now)
+                        )
+            except Exception:
+                # Put the batch back (newer pending updates win) and retry later
+                with self._pending_lock:
+                    for key, data in batch.items():
+                        data.update(self._pending.get(key, {}))
+                        self._pending[key] = data
+                raise
+        self.rows_written += len(batch)
+        self.flushes += 1
+
+    def reset_after_fork(self):
+        """
+        Use a fresh connection, locks and flusher in a freshly forked server
+        process; updates still pending belong to the parent, which flushes them.
+        """
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn = None
+        self._wakeup = threading.Event()
+        self._flusher = None
+
+    def stats(self) -> Dict:
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'updates_received': self.updates_received,
+            'rows_written': self.rows_written,
+            'flushes': self.flushes
+        }
+
+
+# Global instance
+progress_store = ProgressStore()
+atexit.register(progress_store.flush)
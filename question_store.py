@@ -0,0 +1,107 @@
+"""
+In-memory question repository backed by questions.json.
+The file is parsed once per process and re-read only when its mtime changes.
+"""
+import json
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+QUESTIONS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'questions.json')
+
+
+class QuestionStore:
+    """Process-wide question bank with id, category and difficulty indexes."""
+
+    def __init__(self, path: str = QUESTIONS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._by_id: Dict[str, Dict] = {}
+        self._by_category: Dict[str, List[str]] = {}
+        self._by_difficulty: Dict[str, List[str]] = {}
+        self._reload_listeners: List[Callable[[], None]] = []
+
+    def add_reload_listener(self, callback: Callable[[], None]):
+        """Call callback whenever the question bank changes after the first load."""
+        self._reload_listeners.append(callback)
+
+    def _notify_reload(self):
+        for callback in self._reload_listeners:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️  Question reload listener failed: {e}")
+
+    def _refresh(self):
+        """Reload the file if it changed on disk since the last load."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            reloaded = self._mtime is not None
+            questions = {}
+            if mtime is not None:
+                with open(self.path, 'r') as f:
+                    questions = json.load(f)
+            self._build_indexes(questions)
+            self._mtime = mtime
+        if reloaded:
+            self._notify_reload()
+
+    def _build_indexes(self, questions: Dict):
+        by_category: Dict[str, List[str]] = {}
+        by_difficulty: Dict[str, List[str]] = {}
+        for question_id, question in questions.items():
+            category = question.get('category', '').lower()
+            difficulty = question.get('difficulty', '').lower()
+            by_category.setdefault(category, []).append(question_id)
+            by_difficulty.setdefault(difficulty, []).append(question_id)
+
+        # Swap in complete indexes so readers never see a half-built state
+        self._by_id = questions
+        self._by_category = by_category
+        self._by_difficulty = by_difficulty
+
+    def all(self) -> Dict:
+        """Return every question keyed by id."""
+        self._refresh()
+        return self._by_id
+
+    def get(self, question_id: str) -> Optional[Dict]:
+        """Return a single question or None."""
+        self._refresh()
+        return self._by_id.get(question_id)
+
+    def filter(self, category: str = None, difficulty: str = None) -> Dict:
+        """Return questions matching the given category and/or difficulty."""
+        self._refresh()
+        ids = None
+        if category:
+            ids = set(self._by_category.get(category.lower(), []))
+        if difficulty:
+            matching = set(self._by_difficulty.get(difficulty.lower(), []))
+            ids = matching if ids is None else ids & matching
+        if ids is None:
+            return self._by_id
+        return {qid: q for qid, q in self._by_id.items() if qid in ids}
+
+    def save(self, questions: Dict):
+        """Write the question bank to disk and refresh the in-memory copy."""
+        with self._lock:
+            with open(self.path, 'w') as f:
+                json.dump(questions, f, indent=2)
+            self._build_indexes(questions)
+            self._mtime = os.stat(self.path).st_mtime_ns
+        self._notify_reload()
+
+
+# Global instance
+question_store = QuestionStore()
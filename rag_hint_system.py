@@ -3,10 +3,23 @@ RAG-based hint system using problem solutions knowledge base + LLM.
 """
 import json
 import os
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional, Tuple
+
+from code_analyzer import code_analyzer, code_fingerprint
+from response_cache import ResponseCache
+from question_store import question_store
+from inference_service import InferenceService
+
+
+def slugify(text) -> str:
+    """Normalize ids, titles and slugs to 'lower-hyphen' form for alias lookups."""
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')
+
 
 class RAGHintSystem:
-    def __init__(self, knowledge_base_path: str = None, llm_model_path: str = None):
+    def __init__(self, knowledge_base_path: str = None, llm_model_path: str = None,
+                 hint_cache_path: str = None):
         """Initialize RAG system with knowledge base and LLM."""
         if knowledge_base_path is None:
             knowledge_base_path = os.path.join(os.path.dirname(__file__), 'knowledge_base.json')
@@ -16,12 +29,22 @@ class RAGHintSystem:
             llm_model_path = os.path.join(os.path.dirname(__file__), 'models', 'deepseek-coder-1.3b-instruct.Q4_K_M.gguf')
         
         self.knowledge_base = {}
-        self.llm = None
+        self.kb_aliases: Dict[str, str] = {}  # normalized alias -> KB slug
+        self.inference = InferenceService()  # Owns the model; serializes all generation
         self.llm_model_path = llm_model_path
-        self.llm_loading_attempted = False  # Track if we've tried to load
+        
+        # Cache LLM hints so repeated requests for unchanged code skip inference.
+        # Set HINT_CACHE_PATH to keep cached hints across restarts.
+        self.hint_cache = ResponseCache(
+            'hints',
+            max_entries=1024,
+            ttl_seconds=6 * 3600,
+            disk_path=hint_cache_path or os.environ.get('HINT_CACHE_PATH')
+        )
         
         self.load_knowledge_base(knowledge_base_path)
-        # Don't load LLM at startup - load it lazily when first hint is requested
+        # Don't load LLM at startup - load it lazily when first hint is requested,
+        # or in the background via preload_llm() (PRELOAD_LLM=1)
     
     def load_knowledge_base(self, path: str):
         """Load the knowledge base from JSON file."""
@@ -34,39 +57,63 @@ class RAGHintSystem:
                 print(f"⚠️  Knowledge base not found at {path}. Run download_solutions.py first.")
         except Exception as e:
             print(f"❌ Error loading knowledge base: {e}")
+        self.build_kb_index(question_store.all())
+    
+    def build_kb_index(self, questions: Dict):
+        """
+        Precompute alias -> KB slug lookups from KB slugs and the question bank.
+        
+        Aliases are exact normalized forms only (no substring matching), so a
+        question resolves to the same entry every time. Canonical hyphenated
+        slugs are indexed before underscore duplicates and therefore win.
+        """
+        aliases = {}
+        for slug in sorted(self.knowledge_base, key=lambda s: ('_' in s, s)):
+            aliases.setdefault(slugify(slug), slug)
+        
+        unmapped = []
+        for question_id, question in questions.items():
+            slug = None
+            for candidate in (question_id, question.get('title', '')):
+                slug = aliases.get(slugify(candidate))
+                if slug:
+                    break
+            if not slug:
+                unmapped.append(question_id)
+                continue
+            aliases.setdefault(slugify(question_id), slug)
+            aliases.setdefault(slugify(question.get('title', '')), slug)
+            if question.get('leetcode_number'):
+                aliases.setdefault(f"lc-{question['leetcode_number']}", slug)
+        
+        self.kb_aliases = aliases
+        if unmapped:
+            print(f"⚠️  {len(unmapped)} questions have no knowledge base entry: {', '.join(sorted(unmapped))}")
+    
+    def resolve_problem(self, question: Dict) -> Tuple[Optional[str], Optional[Dict]]:
+        """Find the KB entry for a question by id, title or LeetCode number."""
+        candidates = [slugify(question.get('id', '')), slugify(question.get('title', ''))]
+        if question.get('leetcode_number'):
+            candidates.append(f"lc-{question['leetcode_number']}")
+        for candidate in candidates:
+            slug = self.kb_aliases.get(candidate)
+            if slug:
+                return slug, self.knowledge_base[slug]
+        return None, None
     
     def load_llm(self):
         """Load the LLM for intelligent hint generation."""
-        try:
-            if os.path.exists(self.llm_model_path):
-                from llama_cpp import Llama
-                import platform
-                
-                # Detect Apple Silicon and use Metal GPU acceleration
-                is_apple_silicon = platform.system() == 'Darwin' and platform.machine() == 'arm64'
-                gpu_layers = 28 if is_apple_silicon else 0  # Deepseek-1.3B has fewer layers
-                
-                print(f"🔄 Loading Deepseek-Coder-1.3B from {self.llm_model_path}...")
-                if is_apple_silicon:
-                    print(f"🚀 Apple Silicon detected! Using Metal GPU acceleration ({gpu_layers} layers)")
-                
-                self.llm = Llama(
-                    model_path=self.llm_model_path,
-                    n_ctx=4096,  # Deepseek supports larger context
-                    n_threads=4,
-                    n_gpu_layers=gpu_layers,  # Use Metal GPU on Apple Silicon
-                    use_mlock=True,  # Keep model in RAM for faster inference
-                    n_batch=512,  # Batch size for prompt processing
-                    logits_all=False,  # Only compute logits for last token (fixes corruption)
-                    vocab_only=False,
-                    verbose=False  # Reduce terminal spam
-                )
-                print("✅ LLM loaded successfully with GPU acceleration!")
-            else:
-                print(f"⚠️  LLM model not found at {self.llm_model_path}")
-        except Exception as e:
-            print(f"⚠️  Could not load LLM: {e}")
-            print("📝 Falling back to knowledge-base only hints")
+        self.inference.load_model(self.llm_model_path)
+    
+    def preload_llm(self):
+        """Start loading the LLM in the background; KB hints are served until it is ready."""
+        print("🔄 Preloading LLM in the background...")
+        self.inference.start_background_load(self.llm_model_path)
+    
+    def reset_after_fork(self):
+        """Per-process state for a freshly forked server process: the model and the hint cache's disk tier."""
+        self.inference.reset_after_fork()
+        self.hint_cache.reset_after_fork()
     
     def get_hint(self, question: Dict, user_code: str, hint_type: str = 'general') -> str:
         """
@@ -80,59 +127,101 @@ class RAGHintSystem:
         Returns:
             Contextual hint based on problem and user's progress
         """
-        # Get problem slug or title
-        title = question.get('title', '').lower()
-        problem_id = question.get('id', '')
+        hint = None
+        for event in self.stream_hint(question, user_code, hint_type):
+            if event['type'] == 'done':
+                hint = event['hint']
+        return hint
+    
+    def stream_hint(self, question: Dict, user_code: str, hint_type: str = 'general'):
+        """
+        Same as get_hint, but yields events while the hint is produced.
+        
+        Yields:
+            {'type': 'token', 'text': ...}  - next piece of an LLM hint
+            {'type': 'reset'}               - discard streamed text (LLM output rejected)
+            {'type': 'done', 'hint': ..., 'source': 'llm' | 'cache' | 'kb' | 'generic'}
+        """
+        # Analyze user's code once; the prompt and every fallback share the result
+        code_progress = self._analyze_code_progress(user_code, question.get('category', ''))
         
         # Try to find in knowledge base
-        problem_kb = None
-        for slug, data in self.knowledge_base.items():
-            if slug in title or title.replace(' ', '-') in slug:
-                problem_kb = data
-                break
+        _, problem_kb = self.resolve_problem(question)
         
         if not problem_kb:
             # Fallback to generic hints
-            return self._generic_hint(question, user_code, hint_type)
+            yield {'type': 'done', 'hint': self._generic_hint(question, code_progress, hint_type), 'source': 'generic'}
+            return
         
-        # Analyze user's code progress
-        code_progress = self._analyze_code_progress(user_code)
-        
-        # Try to load LLM lazily if not already loaded
-        if not self.llm_loading_attempted:
-            print("🔄 Loading LLM on first hint request...")
+        # Load the LLM lazily on first use, or retry a failed load once its backoff
+        # has passed. While a background preload is running, serve KB hints instead.
+        if self.inference.should_attempt_load():
+            print("🔄 Loading LLM on hint request...")
             self.load_llm()
-            self.llm_loading_attempted = True
         
         # Try to use LLM for intelligent hints
-        if self.llm and user_code.strip():
+        if self.inference.is_ready() and user_code.strip():
+            cache_key = self._hint_cache_key(question, user_code, hint_type)
+            cached_hint = self.hint_cache.get(cache_key)
+            if cached_hint:
+                yield {'type': 'done', 'hint': cached_hint, 'source': 'cache'}
+                return
+            
+            approach = problem_kb.get('approach', '')
+            emoji = {'general': '💡', 'specific': '🎯', 'next_step': '📝'}.get(hint_type, '💡')
+            header = f"{emoji} **{approach}**\n\n"
+            streamed = False
             try:
-                llm_hint = self._generate_llm_hint(question, problem_kb, user_code, code_progress, hint_type)
+                prefix, prompt = self._build_llm_prompt(question, problem_kb, code_progress, hint_type)
+                pieces = []
+                for text in self._stream_llm_completion(prompt, prefix):
+                    if not streamed:
+                        yield {'type': 'token', 'text': header}
+                        streamed = True
+                    pieces.append(text)
+                    yield {'type': 'token', 'text': text}
+                
+                llm_hint = self._clean_llm_hint(''.join(pieces))
                 if llm_hint:
-                    return llm_hint
+                    llm_hint = header + llm_hint
+                    self.hint_cache.set(cache_key, llm_hint)
+                    yield {'type': 'done', 'hint': llm_hint, 'source': 'llm'}
+                    return
             except Exception as e:
                 print(f"LLM hint generation failed: {e}")
+            
+            if streamed:
+                yield {'type': 'reset'}
         
         # Fallback to template-based hints
         if hint_type == 'general':
-            return self._generate_general_hint(problem_kb, code_progress)
+            hint = self._generate_general_hint(problem_kb, code_progress)
         elif hint_type == 'specific':
-            return self._generate_specific_hint(problem_kb, code_progress)
+            hint = self._generate_specific_hint(problem_kb, code_progress)
         else:  # next_step
-            return self._generate_next_step_hint(problem_kb, code_progress)
+            hint = self._generate_next_step_hint(problem_kb, code_progress)
+        yield {'type': 'done', 'hint': hint, 'source': 'kb'}
+    
+    def _hint_cache_key(self, question: Dict, user_code: str, hint_type: str) -> str:
+        """Cache key: question, hint type and the comment/whitespace-normalized code."""
+        question_key = question.get('id') or question.get('title', '').lower()
+        return f"{question_key}:{hint_type}:{code_fingerprint(user_code)}"
     
-    def _analyze_code_progress(self, code: str) -> Dict:
-        """Analyze user's code to understand their progress."""
+    def _analyze_code_progress(self, code: str, category: str = '') -> Dict:
+        """Summarize the user's progress from CodeAnalyzer's (cached) AST analysis."""
+        analysis = code_analyzer.analyze_code(code, category)
+        structures = analysis['data_structures']
         progress = {
-            'has_code': len(code.strip()) > 50,
-            'has_loop': 'for ' in code or 'while ' in code,
-            'has_dict': '{' in code or 'dict(' in code.lower(),
-            'has_set': 'set(' in code,
-            'has_list': '[' in code or 'list(' in code.lower(),
-            'has_function': 'def ' in code,
-            'has_return': 'return ' in code,
-            'has_if': 'if ' in code,
-            'line_count': len([l for l in code.split('\n') if l.strip()])
+            'has_code': analysis['lines_of_code'] > 3,  # more than the class/def/pass template
+            'has_loop': analysis['has_loop'],
+            'has_dict': 'dict' in structures,
+            'has_set': 'set' in structures,
+            'has_list': 'list' in structures,
+            'has_function': analysis['has_method'],
+            'has_return': analysis['has_return'],
+            'has_if': analysis['has_conditionals'],
+            'line_count': analysis['lines_of_code'],
+            'patterns': analysis['patterns_detected']
         }
         return progress
     
@@ -225,23 +314,37 @@ class RAGHintSystem:
         
         return f"📝 **Next Step**\n\nImplement the {approach} logic. Remember to handle edge cases and return the result."
     
-    def _generate_llm_hint(self, question: Dict, problem_kb: Dict, user_code: str, code_progress: Dict, hint_type: str) -> str:
-        """Generate intelligent hint using LLM with RAG context."""
+    def _build_llm_prompt(self, question: Dict, problem_kb: Dict, code_progress: Dict, hint_type: str) -> Tuple[str, str]:
+        """
+        Build the hint prompt from the KB entry and the user's progress.
+        
+        Returns:
+            (prefix, prompt) - the prefix holds only per-question context, so the
+            inference service can cache its evaluated state and reuse it for every
+            later hint on the same question; only the instruction tail changes.
+        """
         # Build context from knowledge base
         approach = problem_kb.get('approach', '')
         key_insight = problem_kb.get('key_insight', '')
         pattern = problem_kb.get('pattern', '')
         time_complexity = problem_kb.get('time_complexity', '')
-        explanation = problem_kb.get('explanation', '')
         
         # Add hint sequence for reference
         hint_sequence = problem_kb.get('hint_sequence', [])
         hints_text = ""
         if hint_sequence:
-            hints_text = "\nKnown Hints:\n"
+            hints_text = "Known Hints:\n"
             for i, h in enumerate(hint_sequence[:2]):  # Only use first 2 hints
                 hints_text += f"- {h}\n"
         
+        prefix = f"""Problem: {question.get('title', '')} ({question.get('difficulty', '')})
+Pattern: {pattern}
+Known approach: {approach}
+Key insight: {key_insight if key_insight else 'what makes this problem solvable'}
+Expected complexity: {time_complexity if time_complexity else 'O(n) or better'}
+{hints_text}
+"""
+        
         # Analyze what user has done
         progress_summary = []
         if code_progress['has_function']:
@@ -250,88 +353,162 @@ class RAGHintSystem:
             progress_summary.append("added loop")
         if code_progress['has_dict']:
             progress_summary.append("using dictionary")
+        if code_progress['has_set']:
+            progress_summary.append("using set")
         if code_progress['has_return']:
             progress_summary.append("has return")
+        if code_progress['patterns']:
+            progress_summary.append(f"code looks like {', '.join(code_progress['patterns']).replace('_', ' ')}")
         
         progress_text = ", ".join(progress_summary) if progress_summary else "just started"
         
-        # Build a focused, directive prompt
+        # Build a focused, directive instruction
         if hint_type == 'general':
             instruction = f"""Give a brief hint about the APPROACH to solve "{question.get('title', '')}".
-            
+
 Mention:
-1. The algorithm pattern ({pattern})
-2. One key insight: {key_insight if key_insight else 'what makes this problem solvable'}
-3. Expected complexity: {time_complexity if time_complexity else 'O(n) or better'}
+1. The algorithm pattern
+2. The key insight
+3. The expected complexity
 
 Format: 2-3 short sentences. Be direct and specific to THIS problem."""
         
         elif hint_type == 'specific':
-            instruction = f"""The student has {progress_text}. Give a SPECIFIC implementation hint.
-
-Known approach: {approach}
-{hints_text}
+            instruction = f"""The student has {progress_text}. Give a SPECIFIC implementation hint based on the known approach and hints.
 
 Tell them ONE specific thing to implement next. Be concrete, not abstract."""
         
         else:  # next_step
-            instruction = f"""The student has {progress_text}. Tell them the EXACT NEXT CODE to write.
-
-Known approach: {approach}
+            instruction = f"""The student has {progress_text}. Tell them the EXACT NEXT CODE to write for the known approach.
 
 Be very specific: "Initialize a hash map called 'seen' to store..." NOT "consider using a data structure"."""
         
-        # Simplified, focused prompt
-        prompt = f"""Problem: {question.get('title', '')} ({question.get('difficulty', '')})
-
-{instruction}
+        prompt = f"""{prefix}{instruction}
 
 Hint:"""
         
-        try:
-            response = self.llm(
-                prompt,
-                max_tokens=150,
-                temperature=0.5,  # Lower temperature for more focused output
-                top_p=0.85,
-                top_k=40,  # Add top_k for more deterministic output
-                repeat_penalty=1.2,  # Discourage repetition
-                stop=["Problem:", "Student:", "\n\n\n", "```"],  # Better stop sequences
-                echo=False
-            )
-            
-            hint = response['choices'][0]['text'].strip()
-            
-            # Filter out meta-commentary
-            if not hint or len(hint) < 20 or any(bad in hint.lower() for bad in [
-                'your advice', 'this hint', 'the student should', 'i suggest', 'i recommend',
-                'you should help', 'provide guidance', 'give advice'
-            ]):
-                # LLM gave unhelpful output, use knowledge base instead
-                print(f"⚠️ LLM output too generic, using knowledge base")
-                return None  # Will trigger fallback
-            
-            # Clean up the hint
-            hint = hint.replace('Hint:', '').strip()
-            
-            # Add emoji based on hint type
-            emoji = {'general': '💡', 'specific': '🎯', 'next_step': '📝'}.get(hint_type, '💡')
-            return f"{emoji} **{approach}**\n\n{hint}"
-            
-        except Exception as e:
-            print(f"Error generating LLM hint: {e}")
-            return None
+        return prefix, prompt
     
-    def _generic_hint(self, question: Dict, user_code: str, hint_type: str) -> str:
-        """Fallback generic hints when problem not in KB."""
+    def _stream_llm_completion(self, prompt: str, prefix: str = None):
+        """Yield completion text pieces as the inference service produces them."""
+        yield from self.inference.stream(
+            prompt,
+            prefix=prefix,
+            max_tokens=150,
+            temperature=0.5,  # Lower temperature for more focused output
+            top_p=0.85,
+            top_k=40,  # Add top_k for more deterministic output
+            repeat_penalty=1.2,  # Discourage repetition
+            stop=["Problem:", "Student:", "\n\n\n", "```"],  # Better stop sequences
+            echo=False
+        )
+    
+    def _clean_llm_hint(self, raw_hint: str) -> Optional[str]:
+        """Return the cleaned LLM hint, or None if it is too generic to show."""
+        hint = raw_hint.strip()
+        
+        # Filter out meta-commentary
+        if not hint or len(hint) < 20 or any(bad in hint.lower() for bad in [
+            'your advice', 'this hint', 'the student should', 'i suggest', 'i recommend',
+            'you should help', 'provide guidance', 'give advice'
+        ]):
+            # LLM gave unhelpful output, use knowledge base instead
+            print(f"⚠️ LLM output too generic, using knowledge base")
+            return None  # Will trigger fallback
+        
+        # Clean up the hint
+        return hint.replace('Hint:', '').strip()
+    
+    def _generic_hint(self, question: Dict, progress: Dict, hint_type: str) -> str:
+        """Category-based hints when the problem is not in the KB."""
         category = question.get('category', '').lower()
+        title = question.get('title', '').lower()
+        
+        has_code = progress['has_code']
+        has_loop = progress['has_loop']
+        has_dict = progress['has_dict']
+        
+        # Category-specific hints based on hint type
+        if 'array' in category or 'list' in category or 'two pointer' in category:
+            if hint_type == 'general':
+                return "💡 Consider using two pointers or a hash map to track elements efficiently."
+            elif hint_type == 'specific':
+                if not has_dict:
+                    return "🎯 Use a dictionary (hash map) to store values as you iterate. This gives O(1) lookup time!"
+                else:
+                    return "🎯 Good! Now think about what to store in your hash map - perhaps the value as key and index as value?"
+            else:  # next_step
+                if not has_loop:
+                    return "📝 Next: Start with 'for i, num in enumerate(nums):' to iterate through the array."
+                else:
+                    return "📝 Next: Inside your loop, check if the complement exists in your hash map before adding the current value."
+        
+        elif 'hash' in category or 'map' in category or 'set' in title:
+            if hint_type == 'general':
+                return "💡 Hash maps provide O(1) lookup! Think about what you need to store and retrieve quickly."
+            elif hint_type == 'specific':
+                return "🎯 Create a dictionary to map each element to additional info (like its index, count, or related value)."
+            else:
+                return "📝 Next: Initialize an empty dict, then iterate through your input and populate it: seen = {}"
+        
+        elif 'tree' in category:
+            if hint_type == 'general':
+                return "💡 Tree problems often use recursion. Think about: base case, what to do at each node, and how to combine results."
+            elif hint_type == 'specific':
+                return "🎯 For binary trees, consider these traversals: in-order (left, root, right), pre-order (root, left, right), or post-order (left, right, root)."
+            else:
+                return "📝 Next: Define a helper function that takes a node as parameter. Handle the None case first (base case)."
+        
+        elif 'graph' in category:
+            if hint_type == 'general':
+                return "💡 Graph traversal: Use BFS (queue) for shortest paths or level-by-level. Use DFS (stack/recursion) for paths or connectivity."
+            elif hint_type == 'specific':
+                return "🎯 Always track visited nodes using a set to avoid cycles: visited = set(). Check 'if node not in visited' before processing."
+            else:
+                return "📝 Next: Initialize a queue (for BFS) or use recursion (for DFS), and a visited set. Start from your source node."
         
+        elif 'dynamic programming' in category or 'dp' in category:
+            if hint_type == 'general':
+                return "💡 DP = Recursion + Memoization. Identify overlapping subproblems and optimal substructure."
+            elif hint_type == 'specific':
+                return "🎯 Create a DP array where dp[i] represents the answer for subproblem i. Define your base cases (like dp[0] = ...) first."
+            else:
+                return "📝 Next: Write the recurrence relation. How does dp[i] relate to previous values like dp[i-1]?"
+        
+        elif 'binary search' in category or 'search' in category:
+            if hint_type == 'general':
+                return "💡 Binary search works on sorted data. Eliminate half the search space each iteration → O(log n)."
+            elif hint_type == 'specific':
+                return "🎯 Set left=0, right=len(array)-1. In loop: mid=(left+right)//2. Compare array[mid] with target to adjust left or right."
+            else:
+                return "📝 Next: Use 'while left <= right:' and update left=mid+1 or right=mid-1 based on comparison."
+        
+        elif 'string' in category:
+            if hint_type == 'general':
+                return "💡 String problems often use: sliding window, two pointers, hash maps for character counting, or string manipulation."
+            elif hint_type == 'specific':
+                return "🎯 Use a hash map to count character frequencies: char_count = {} or collections.Counter()."
+            else:
+                return "📝 Next: Iterate through the string with 'for char in s:' and build your solution character by character."
+        
+        elif 'linked list' in category or 'linkedlist' in category:
+            if hint_type == 'general':
+                return "💡 Linked list tip: Use two pointers (slow/fast) or dummy nodes to simplify edge cases."
+            elif hint_type == 'specific':
+                return "🎯 Create a dummy node: dummy = ListNode(0); dummy.next = head. This helps handle edge cases like empty lists."
+            else:
+                return "📝 Next: Traverse with 'while current:' and use 'current = current.next' to move forward."
+        
+        # Generic hints
         if hint_type == 'general':
-            return f"💡 Category: {category}\n\nThink about what data structure best fits this problem type."
+            return f"💡 Category: {category}\n\nBreak down the problem: 1) What's the input/output? 2) What data structure fits? 3) What's the time complexity goal?"
         elif hint_type == 'specific':
-            return "🎯 Break the problem into smaller steps and solve each one."
+            if not has_code:
+                return "🎯 Start by writing the function signature and thinking about your approach before coding."
+            else:
+                return "🎯 Consider edge cases: empty input, single element, duplicates. Does your solution handle them?"
         else:
-            return "📝 Start by writing out the function signature and thinking about your approach."
+            return "📝 Next: Implement a brute force solution first, then think about optimizations."
 
 # Global instance
 rag_system = RAGHintSystem()
@@ -0,0 +1,133 @@
+"""
+LRU + TTL response cache with an optional SQLite tier that survives restarts.
+Values must be JSON-serializable.
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """Bounded in-memory LRU with expiry, backed by an optional disk tier."""
+
+    def __init__(self, name: str, max_entries: int = 512, ttl_seconds: float = 3600,
+                 disk_path: str = None, max_disk_entries: int = 10000):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.max_disk_entries = max_disk_entries
+
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if not self.disk_path:
+            return None
+        if self._conn is None:
+            conn = sqlite3.connect(self.disk_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL)'
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            conn = self._disk()
+            if conn is not None:
+                row = conn.execute(
+                    'SELECT value, expires_at FROM cache WHERE key = ?', (key,)
+                ).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """Store a value in memory and, if configured, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+                        (key, json.dumps(value), expires_at)
+                    )
+                    # Keep the disk tier bounded: drop expired rows, then the oldest
+                    conn.execute('DELETE FROM cache WHERE expires_at <= ?', (time.time(),))
+                    conn.execute(
+                        'DELETE FROM cache WHERE key IN ('
+                        ' SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+                        (self.max_disk_entries,)
+                    )
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            conn = self._disk()
+            if conn is not None:
+                with conn:
+                    conn.execute('DELETE FROM cache')
+
+    def reset_after_fork(self):
+        """Reopen the disk tier lazily in a freshly forked process (SQLite connections must not cross a fork)."""
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'name': self.name,
+            'entries': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'disk_tier': bool(self.disk_path),
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+        }
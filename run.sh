@@ -10,8 +10,8 @@ if [ ! -f "questions.json" ]; then
     python3 questions_init.py
 fi
 
-# Check if Flask is installed
-if ! python3 -c "import flask" 2>/dev/null; then
+# Check if Flask and Gunicorn are installed
+if ! python3 -c "import flask, gunicorn" 2>/dev/null; then
     echo "📦 Installing dependencies..."
     pip3 install -r requirements.txt
 fi
@@ -20,5 +20,10 @@ echo "✅ Starting server..."
 echo "🌐 Open http://localhost:5000 in your browser"
 echo ""
 
-python3 app.py
+# DEV=1 runs the Flask debug server with the reloader instead
+if [ "$DEV" = "1" ]; then
+    python3 app.py
+else
+    gunicorn -c gunicorn.conf.py wsgi:application
+fi
 
@@ -0,0 +1,52 @@
+"""
+Content-addressed cache of test run results.
+A run is identified by its exact source, its test suite (cases, entry point
+and run options) and the harness version, so re-running unchanged code on an
+unchanged suite returns the stored result without starting a sandbox. The
+source is not normalized: tracebacks and warnings carry line numbers, which
+even a comment-only edit can shift.
+"""
+import hashlib
+import json
+import os
+from typing import Dict
+
+from response_cache import ResponseCache
+from sandbox_harness import HARNESS_VERSION
+
+# Results larger than this are not kept (huge outputs would crowd out everything else)
+MAX_CACHED_RESULT_BYTES = 256 * 1024
+
+# Job fields that decide a run's outcome besides the code itself
+SUITE_FIELDS = ('entry_point', 'test_cases', 'execute_mode', 'fail_fast', 'order', 'comparator')
+
+
+def suite_hash(job: Dict) -> str:
+    """Hash of the test suite, its comparator and the run options of a 'tests' job."""
+    suite = {field: job.get(field) for field in SUITE_FIELDS}
+    if not job.get('fail_fast'):
+        # Results are reported in suite order, so the run order only matters
+        # when it decides where a fail-fast run stops
+        suite['order'] = None
+    encoded = json.dumps(suite, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def run_cache_key(job: Dict) -> str:
+    """Cache key of a 'tests' job: source hash, suite hash and harness version."""
+    source = hashlib.sha256(job['code'].encode('utf-8')).hexdigest()
+    return f"{source}:{suite_hash(job)}:{HARNESS_VERSION}"
+
+
+def is_cacheable(payload: Dict) -> bool:
+    """Small enough to keep (timeouts and crashes are never offered to the cache)."""
+    return len(json.dumps(payload, default=str)) <= MAX_CACHED_RESULT_BYTES
+
+
+# Global instance. Set RUN_CACHE_PATH to keep results across restarts.
+run_cache = ResponseCache(
+    'runs',
+    max_entries=512,
+    ttl_seconds=24 * 3600,
+    disk_path=os.environ.get('RUN_CACHE_PATH')
+)
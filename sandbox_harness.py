@@ -0,0 +1,1131 @@
+"""
+Test harness imported once by every sandbox worker.
+User code, the entry point name and test cases arrive as data; the harness
+compiles the code into a namespace pre-populated with the usual LeetCode
+prelude and runs each case, so no runner source is generated per request.
+"""
+import ast
+import copy
+import gc
+import hashlib
+import io
+import math
+import os
+import pickle
+import random
+import signal
+import statistics
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+import input_generators
+from comparators import results_match, modified_argument, compact_result
+
+# Bump whenever result semantics change (used to key cached results)
+HARNESS_VERSION = '10'
+
+# Cases slower than this skip the traced memory pass: tracemalloc slows a call
+# down about TRACEMALLOC_SLOWDOWN times, which would eat the job's CPU allowance
+MEMORY_PASS_MAX_NS = 5_000_000
+TRACEMALLOC_SLOWDOWN = 10
+
+# Captured console output kept per test case
+MAX_CONSOLE_CHARS = 16384
+
+# Fuzzing raises the maximum input size by one every this many cases
+FUZZ_SIZE_STEP = 50
+
+# Benchmarks keep at least this many timed runs per side, whatever the budget
+MIN_BENCHMARK_REPEATS = 10
+# z for the ~95% confidence interval of a benchmark's median
+BENCHMARK_CONFIDENCE_Z = 1.96
+# CPU seconds a benchmark keeps back for its statistics and reply, so it stops
+# sampling with partial results instead of dying at the CPU limit
+BENCHMARK_CPU_RESERVE_SECONDS = 0.5
+
+# ---------------------------------------------------------------------------
+# LeetCode prelude: names LeetCode makes available without imports
+# ---------------------------------------------------------------------------
+PRELUDE_SOURCE = '''
+from typing import *
+import collections
+import heapq
+import bisect
+import math
+import itertools
+import functools
+import string
+import re
+from collections import defaultdict, deque, Counter, OrderedDict
+from heapq import heappush, heappop, heapify
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from math import inf
+try:
+    from functools import cache
+except ImportError:  # Python < 3.9
+    cache = lru_cache(maxsize=None)
+
+
+class ListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+
+class TreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+'''
+
+_PRELUDE: Dict = {'__name__': '__main__', '__builtins__': __builtins__}
+exec(compile(PRELUDE_SOURCE, '<prelude>', 'exec'), _PRELUDE)
+
+
+# ---------------------------------------------------------------------------
+# Entry point resolution (also used by the server, before dispatching a job)
+# ---------------------------------------------------------------------------
+_entry_point_cache: OrderedDict = OrderedDict()
+_entry_point_lock = threading.Lock()
+
+
+def _solution_methods(code: str) -> Optional[List[ast.FunctionDef]]:
+    """Methods of class Solution in definition order; None if code does not parse."""
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.name == 'Solution':
+            return [n for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+    return [n for n in tree.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+
+
+def resolve_entry_point(code: str, preferred: str = None) -> Optional[Dict]:
+    """
+    Find the method to call from the code's AST.
+
+    Prefers `preferred` (the method named in the question template), then the
+    first public method of class Solution, so helper methods defined before the
+    entry point are skipped. Results are cached by code hash.
+
+    Returns:
+        {'name': method name, 'params': parameter names without self} or None
+    """
+    key = hashlib.sha256(code.encode('utf-8')).hexdigest() + ':' + (preferred or '')
+    with _entry_point_lock:
+        if key in _entry_point_cache:
+            _entry_point_cache.move_to_end(key)
+            return _entry_point_cache[key]
+
+    entry = None
+    methods = _solution_methods(code)
+    if methods:
+        by_name = {m.name: m for m in methods}
+        public = [m for m in methods if not m.name.startswith('_')]
+        method = by_name.get(preferred) or (public or methods)[0]
+        params = [a.arg for a in method.args.posonlyargs + method.args.args]
+        if params and params[0] == 'self':
+            params = params[1:]
+        entry = {'name': method.name, 'params': params}
+
+    with _entry_point_lock:
+        _entry_point_cache[key] = entry
+        while len(_entry_point_cache) > 512:
+            _entry_point_cache.popitem(last=False)
+    return entry
+
+
+_static_check_cache: OrderedDict = OrderedDict()
+
+
+def _signature(method: ast.FunctionDef) -> str:
+    args = method.args
+    names = [a.arg for a in args.posonlyargs + args.args]
+    if args.vararg is not None:
+        names.append('*' + args.vararg.arg)
+    names += [a.arg for a in args.kwonlyargs]
+    if args.kwarg is not None:
+        names.append('**' + args.kwarg.arg)
+    return f"{method.name}({', '.join(names)})"
+
+
+def _signature_problem(method: ast.FunctionDef, expected_params: List[str]) -> Optional[str]:
+    """Why the method cannot be called with the template's parameters as keywords, or None."""
+    args = method.args
+    positional = args.posonlyargs + args.args
+    if positional and positional[0].arg == 'self':
+        positional = positional[1:]
+    keyword_names = {a.arg for a in args.args + args.kwonlyargs}
+    unaccepted = [name for name in expected_params if name not in keyword_names]
+    if unaccepted and args.kwarg is None:
+        return f"does not accept {', '.join(unaccepted)}"
+
+    # Parameters without a default value must all be supplied by a test case
+    required = positional[:len(positional) - len(args.defaults)]
+    required += [a for a, default in zip(args.kwonlyargs, args.kw_defaults) if default is None]
+    missing = [a.arg for a in required if a.arg not in expected_params]
+    if missing:
+        return f"requires {', '.join(missing)}, which test cases do not provide"
+    return None
+
+
+def static_check(code: str, template: str = None) -> Dict:
+    """
+    Check user code without running it: it must parse and compile, define
+    class Solution, and (given the question template) define the template's
+    method with parameters test cases can be passed to. Results are cached
+    by hash of code and template.
+
+    Returns:
+        {'success': True, 'message', 'output', 'entry_point'} or
+        {'success': False, 'error', 'line' (when known)}
+    """
+    key = hashlib.sha256((template or '').encode('utf-8') + b'\0' + code.encode('utf-8')).hexdigest()
+    with _entry_point_lock:
+        if key in _static_check_cache:
+            _static_check_cache.move_to_end(key)
+            return dict(_static_check_cache[key])
+
+    result = _static_check(code, template)
+
+    with _entry_point_lock:
+        _static_check_cache[key] = result
+        while len(_static_check_cache) > 512:
+            _static_check_cache.popitem(last=False)
+    return dict(result)
+
+
+def _static_check(code: str, template: str = None) -> Dict:
+    try:
+        tree = ast.parse(code, '<solution>')
+        # Compiling the tree also catches errors ast.parse lets through ('return' outside
+        # a function, ...); nothing is executed
+        compile(tree, '<solution>', 'exec')
+    except SyntaxError as e:
+        kind = 'Indentation Error' if isinstance(e, IndentationError) else 'Syntax Error'
+        text = e.text
+        if text is None and e.lineno and e.lineno <= len(code.splitlines()):
+            # Errors raised while compiling the tree carry no source line
+            text = code.splitlines()[e.lineno - 1]
+        return {
+            'success': False,
+            'error': f"{kind} on line {e.lineno}:\n{e.msg}\n\n{(text or '').rstrip()}",
+            'line': e.lineno
+        }
+    except ValueError as e:
+        return {'success': False, 'error': f'Syntax Error:\n{e}'}
+    except (RecursionError, MemoryError):
+        return {'success': False, 'error': 'Code is too deeply nested or too large to compile.'}
+
+    solution = next((node for node in tree.body
+                     if isinstance(node, ast.ClassDef) and node.name == 'Solution'), None)
+    if solution is None:
+        return {
+            'success': False,
+            'error': "No 'Solution' class found in your code. Make sure to define a class named 'Solution'."
+        }
+    methods = {node.name: node for node in solution.body
+               if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))}
+
+    output = ['✅ Syntax check passed', '✅ Solution class found']
+    expected = resolve_entry_point(template) if template else None
+    if expected:
+        method = methods.get(expected['name'])
+        if method is None:
+            return {
+                'success': False,
+                'error': f"Method '{expected['name']}' not found in class Solution. "
+                         f"The problem template defines {expected['name']}(self, {', '.join(expected['params'])}).",
+                'line': solution.lineno
+            }
+        problem = _signature_problem(method, expected['params'])
+        if problem:
+            return {
+                'success': False,
+                'error': f"{_signature(method)} {problem}. The problem template defines "
+                         f"{expected['name']}(self, {', '.join(expected['params'])}).",
+                'line': method.lineno
+            }
+        output.append(f'✅ {_signature(method)} matches the template')
+        entry_point = expected['name']
+    elif methods:
+        public = [name for name in methods if not name.startswith('_')]
+        entry_point = (public or list(methods))[0]
+    else:
+        return {
+            'success': False,
+            'error': 'Class Solution defines no methods.',
+            'line': solution.lineno
+        }
+
+    return {
+        'success': True,
+        'message': 'Code compiled successfully! No syntax errors found.',
+        'output': '\n'.join(output),
+        'entry_point': entry_point
+    }
+
+
+# ---------------------------------------------------------------------------
+# Running tests
+# ---------------------------------------------------------------------------
+def cpu_remaining() -> float:
+    """
+    CPU seconds left before the worker's RLIMIT_CPU soft limit for this job
+    (see sandbox_worker.apply_limits); infinite when no limit is set.
+    """
+    if resource is None:
+        return float('inf')
+    soft, _ = resource.getrlimit(resource.RLIMIT_CPU)
+    if soft == resource.RLIM_INFINITY:
+        return float('inf')
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return soft - (usage.ru_utime + usage.ru_stime)
+
+
+def _format_exception() -> str:
+    """Traceback of the current exception without the harness's own frames."""
+    etype, value, tb = sys.exc_info()
+    while tb is not None and tb.tb_frame.f_code.co_filename == __file__:
+        tb = tb.tb_next
+    return ''.join(traceback.format_exception(etype, value, tb))
+
+
+def load_solution(code: str, entry_point: str):
+    """Compile user code in a fresh prelude namespace and return the bound method."""
+    namespace = dict(_PRELUDE)
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()  # Discard prints at module level
+    try:
+        exec(compile(code, '<solution>', 'exec'), namespace)
+    finally:
+        sys.stdout = saved_stdout
+
+    solution_class = namespace.get('Solution')
+    if solution_class is None:
+        # Bare functions (e.g. def f(self, ...)) are wrapped in a Solution class
+        solution_class = type('Solution', (), {entry_point: namespace[entry_point]})
+    return getattr(solution_class(), entry_point)
+
+
+def call_method(method, input_data):
+    """Call the entry point with a test input (kwargs, positional list or single value)."""
+    if isinstance(input_data, dict):
+        return method(**input_data)
+    elif isinstance(input_data, list):
+        return method(*input_data)
+    return method(input_data)
+
+
+class TimeLimitExceeded(BaseException):
+    """Raised inside user code when its time budget runs out (not catchable as Exception)."""
+
+
+def _raise_time_limit(signum, frame):
+    raise TimeLimitExceeded()
+
+
+@contextmanager
+def _time_limit(seconds: float):
+    """Interrupt the enclosed code after `seconds` of wall time (no-op without setitimer)."""
+    if not hasattr(signal, 'setitimer'):
+        yield
+        return
+    saved_handler = signal.signal(signal.SIGALRM, _raise_time_limit)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, saved_handler)
+
+
+def _peak_memory(method, input_data) -> Optional[float]:
+    """Peak kilobytes allocated by one call, traced by tracemalloc (prints are discarded)."""
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    tracemalloc.start()
+    try:
+        call_method(method, input_data)
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    except Exception:
+        return None
+    finally:
+        tracemalloc.stop()
+        sys.stdout = saved_stdout
+
+
+def _memory_pass_fits(cpu_ns: int, wall_ns: int) -> bool:
+    """
+    Whether a traced rerun of a call this fast is cheap enough: under the
+    threshold, and using at most a small share of the CPU allowance left,
+    so the memory pass can never push a passing run over its CPU limit.
+    """
+    if wall_ns >= MEMORY_PASS_MAX_NS:
+        return False
+    return TRACEMALLOC_SLOWDOWN * cpu_ns / 1e9 < 0.1 * cpu_remaining()
+
+
+def _measure(method, input_data, measure_memory: bool = True):
+    """
+    Call the entry point, returning (result, error, metrics).
+
+    Wall and CPU time come from perf_counter_ns/process_time_ns on an untraced
+    call, since tracemalloc slows allocation-heavy code by an order of magnitude.
+    Peak memory is then measured by a second, traced call on a pristine copy of
+    the input (in-place solutions mutate it), skipped for slow cases.
+    """
+    pristine = copy.deepcopy(input_data) if measure_memory else None
+    cpu_start = time.process_time_ns()
+    wall_start = time.perf_counter_ns()
+    result = error = None
+    try:
+        result = call_method(method, input_data)
+    except Exception as e:
+        error = e
+    wall_ns = time.perf_counter_ns() - wall_start
+    cpu_ns = time.process_time_ns() - cpu_start
+
+    metrics = {
+        'wall_ms': round(wall_ns / 1e6, 3),
+        'cpu_ms': round(cpu_ns / 1e6, 3),
+        'peak_memory_kb': None
+    }
+    if measure_memory and error is None and _memory_pass_fits(cpu_ns, wall_ns):
+        metrics['peak_memory_kb'] = _peak_memory(method, pristine)
+    return result, error, metrics
+
+
+def run_case(method, index: int, test_case: Dict, measure_memory: bool = True,
+             comparator: Dict = None) -> Dict:
+    """
+    Run one test case, capturing the user's console output and its cost.
+
+    The result is raw: the output (for in-place problems, the modified
+    argument) or the error, with no verdict. judge_case gives the verdict in
+    the worker, outside the process that ran the user's code.
+    """
+    input_data = test_case.get('input', {})
+    console = io.StringIO()
+    saved_stdout = sys.stdout
+    sys.stdout = console
+    try:
+        result, error, metrics = _measure(method, input_data, measure_memory)
+    finally:
+        sys.stdout = saved_stdout
+    console_output = console.getvalue()
+    if len(console_output) > MAX_CONSOLE_CHARS:
+        console_output = console_output[:MAX_CONSOLE_CHARS] + f'\n... ({len(console_output) - MAX_CONSOLE_CHARS} more characters truncated)'
+
+    if error is not None:
+        return dict({'test_case': index + 1, 'error': str(error) or type(error).__name__,
+                     'console_output': console_output}, **metrics)
+    if (comparator or {}).get('name') == 'in_place':
+        result = modified_argument(input_data, comparator)
+    return dict({'test_case': index + 1, 'output': result, 'console_output': console_output}, **metrics)
+
+
+# Fields of a raw case result that judge_case passes through
+CASE_METRICS = ('wall_ms', 'cpu_ms', 'peak_memory_kb')
+
+
+def judge_case(raw: Dict, test_case: Dict, execute_mode: bool, comparator: Dict = None) -> Dict:
+    """
+    The verdict on one raw case result from run_case, in the reply format.
+
+    Only the output, error, console output and metrics are taken from the raw
+    result; the input and expected value come from the job itself. The output
+    is judged by the question's comparator, and large outputs come back as an
+    excerpt and a digest (see comparators.compact_result).
+    """
+    number = raw['test_case']
+    metrics = {field: raw.get(field) for field in CASE_METRICS}
+    console_output = str(raw.get('console_output') or '')
+    input_data = test_case.get('input', {})
+    expected = test_case.get('expected')
+
+    if 'error' in raw:
+        return dict({
+            'test_case': number,
+            'passed': False,
+            'error': str(raw['error']),
+            'input': input_data,
+            'console_output': console_output
+        }, **metrics)
+
+    output = raw.get('output')
+    if execute_mode:
+        # In execute mode, just show the output
+        return compact_result(dict({
+            'test_case': number,
+            'passed': True,
+            'output': output,
+            'expected': expected,
+            'input': input_data,
+            'console_output': console_output
+        }, **metrics), comparator)
+    if expected is None:
+        # Skip test if no expected value provided
+        return compact_result(dict({
+            'test_case': number,
+            'skipped': True,
+            'passed': False,
+            'output': output,
+            'expected': None,
+            'input': input_data,
+            'console_output': console_output,
+            'message': 'No expected output provided for this test case'
+        }, **metrics), comparator)
+    return compact_result(dict({
+        'test_case': number,
+        'passed': results_match(output, expected, comparator),
+        'output': output,
+        'expected': expected,
+        'input': input_data,
+        'console_output': console_output
+    }, **metrics), comparator)
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """Aggregate per-case measurements: total time, worst case and peak memory."""
+    if not results:
+        return {'wall_ms': 0.0, 'cpu_ms': 0.0, 'peak_memory_kb': 0.0, 'slowest_case': None}
+    slowest = max(results, key=lambda r: r.get('cpu_ms', 0))
+    return {
+        'wall_ms': round(sum(r.get('wall_ms', 0) for r in results), 3),
+        'cpu_ms': round(sum(r.get('cpu_ms', 0) for r in results), 3),
+        'peak_memory_kb': max((r.get('peak_memory_kb') or 0) for r in results),
+        'slowest_case': slowest['test_case']
+    }
+
+
+def is_failure(result: Dict) -> bool:
+    """A case that raised or returned a wrong answer (cases without an expected value are not failures)."""
+    return 'error' in result or not (result.get('passed') or result.get('skipped'))
+
+
+def run_tests(job: Dict, emit) -> Dict:
+    """
+    Run a test suite, emitting each case's raw result as soon as it is known.
+
+    Job fields: code, entry_point, test_cases, measure_memory (default True),
+    order (indices of test_cases in the order to run them, default as given)
+    and comparator (spec from comparators.comparator_for, default exact).
+    Results keep their case's original number whatever the order. Verdicts,
+    execute_mode and fail_fast are applied by the worker (see judge_case).
+
+    Returns:
+        {'cases': int}, or {'error': traceback} when the code cannot be loaded
+    """
+    try:
+        method = load_solution(job['code'], job['entry_point'])
+    except BaseException:
+        return {'error': _format_exception()}
+
+    test_cases = job.get('test_cases', [])
+    order = job.get('order') or range(len(test_cases))
+    for index in order:
+        emit('result', run_case(method, index, test_cases[index],
+                                job.get('measure_memory', True), job.get('comparator')))
+    return {'cases': len(order)}
+
+
+def _time_call(method, schema: Dict, n: int, seed: int, min_seconds: float = 0.02,
+               min_repeats: int = 3, max_repeats: int = 5) -> Dict:
+    """
+    Best-of-k runtime of one call on a generated input of size n.
+
+    Calls are repeated (on a freshly generated input each time, since
+    solutions may modify their input) at least min_repeats times, so the
+    first call's page faults and allocator growth do not decide the sample,
+    and fast ones until min_seconds have been spent.
+    """
+    best = None
+    spent = 0.0
+    repeats = 0
+    while repeats < max_repeats and (repeats < min_repeats or spent < min_seconds):
+        input_data = input_generators.generate_input(schema, n, seed)
+        start = time.perf_counter()
+        call_method(method, input_data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        repeats += 1
+    return {'n': n, 'seconds': best, 'repeats': repeats}
+
+
+def run_complexity_probe(job: Dict, emit) -> Dict:
+    """
+    Time the entry point on generated inputs of increasing size.
+
+    Job fields: code, entry_point, schema, sizes, seed, budget_seconds
+    (total, including the predicted next sample), max_sample_seconds (stop
+    growing n after a sample this slow).
+
+    Returns:
+        {'samples': [{'n', 'seconds', 'repeats'}], 'stopped': reason or None}
+        ('failed_at' and 'failure' when the code raised), or {'error': traceback}
+    """
+    try:
+        method = load_solution(job['code'], job['entry_point'])
+    except BaseException:
+        return {'error': _format_exception()}
+
+    budget = job.get('budget_seconds', 2.5)
+    max_sample = job.get('max_sample_seconds', 0.5)
+    samples = []
+    reply = {'samples': samples, 'stopped': None}
+    started = time.perf_counter()
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()  # Prints would only add noise to the timings
+    try:
+        sizes = job.get('sizes', [])
+        for index, n in enumerate(sizes):
+            try:
+                sample = _time_call(method, job['schema'], n, job.get('seed', 0))
+            except Exception as e:
+                reply.update(failed_at=n, failure=f'{type(e).__name__}: {e}')
+                break
+            samples.append(sample)
+            if sample['seconds'] >= max_sample:
+                reply['stopped'] = 'sample_limit'
+                break
+            # Extrapolate the growth of the last step (at least linear) to the next size
+            growth = sizes[index + 1] / n if index + 1 < len(sizes) else 1.0
+            if len(samples) >= 2 and samples[-2]['seconds'] > 0:
+                growth = max(growth, sample['seconds'] / samples[-2]['seconds'])
+            predicted = sample['seconds'] * growth
+            if time.perf_counter() - started + predicted >= budget:
+                reply['stopped'] = 'budget'
+                break
+    finally:
+        sys.stdout = saved_stdout
+    return reply
+
+
+def _run_tier_case(method, input_data, budget: float) -> Dict:
+    """Run one stress case under its time budget and classify the outcome."""
+    start = time.perf_counter()
+    try:
+        with _time_limit(budget):
+            result = call_method(method, input_data)
+    except TimeLimitExceeded:
+        return {'verdict': 'TLE', 'seconds': round(time.perf_counter() - start, 4)}
+    except MemoryError:
+        return {'verdict': 'MLE', 'seconds': round(time.perf_counter() - start, 4)}
+    except RecursionError as e:
+        return {'verdict': 'RE', 'seconds': round(time.perf_counter() - start, 4), 'error': f'RecursionError: {e}'}
+    except Exception as e:
+        return {'verdict': 'RE', 'seconds': round(time.perf_counter() - start, 4), 'error': f'{type(e).__name__}: {e}'}
+    seconds = time.perf_counter() - start
+    # The alarm only fires while Python code runs, so re-check long C calls here
+    if seconds > budget:
+        return {'verdict': 'TLE', 'seconds': round(seconds, 4)}
+    return {'verdict': 'OK', 'seconds': round(seconds, 4), 'result': result}
+
+
+def _guaranteed_inputs(schema: Dict, n: int, seeds):
+    """
+    Generated inputs of size n, one per seed, leaving out those that broke the
+    question's guarantee. Every other input drops worst-case orders
+    (input_generators.typical_schema), so the answers are not all alike.
+    """
+    schemas = (schema, input_generators.typical_schema(schema))
+    for i, seed in enumerate(seeds):
+        try:
+            yield input_generators.generate_input(schemas[i % 2], n, seed)
+        except input_generators.GuaranteeNotMet:
+            continue
+
+
+def _compared_outputs(output, expected, user_args, reference_args, comparator: Dict = None):
+    """
+    What to compare for one call of the user's code and the reference.
+
+    Returns (output, expected, in_place). The modified arguments are compared
+    when the comparator is in_place, or when both solutions returned None (an
+    in-place problem without that comparator); otherwise the returned values,
+    so a None result against a real answer is a disagreement.
+    """
+    if (comparator or {}).get('name') == 'in_place':
+        return modified_argument(user_args, comparator), modified_argument(reference_args, comparator), True
+    if output is None and expected is None:
+        return user_args, reference_args, True
+    return output, expected, False
+
+
+def run_stress(job: Dict, emit) -> Dict:
+    """
+    Run size-tiered stress suites, stopping at the first failing tier.
+
+    Job fields: code, entry_point, schema, test_cases (the small tier),
+    comparator, tiers: [{'name', 'n', 'seed', 'cases', 'budget_seconds'}]
+    and optionally reference, reference_entry_point and reference_seconds:
+    the reference runs first on each generated case, within max(tier budget,
+    reference_seconds), and its output is the expected output. Tiers with
+    'reference_slack' budget each case from the reference's time (see
+    stress_tests.build_tiers); the tier reports the largest budget it used.
+
+    Tier verdicts: AC (every case finished in time and the checked ones were
+    right), WA, OK (finished in time but nothing could be checked: no
+    expected output and no reference), TLE, MLE, RE, or SKIPPED after an
+    earlier failure. 'checked' counts the cases whose output was compared.
+
+    Returns:
+        {'tiers': [...]} or {'error': traceback}
+    """
+    try:
+        method = load_solution(job['code'], job['entry_point'])
+    except BaseException:
+        return {'error': _format_exception()}
+    reference = None
+    if job.get('reference'):
+        try:
+            reference = load_solution(job['reference'], job['reference_entry_point'])
+        except BaseException:
+            reference = None  # Generated tiers are then only timed
+
+    comparator = job.get('comparator')
+    tier_results = []
+    failed = False
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        for tier in job.get('tiers', []):
+            summary = {'name': tier['name'], 'n': tier.get('n'), 'budget_seconds': tier['budget_seconds'],
+                       'cases': 0, 'checked': 0, 'max_seconds': 0.0}
+            tier_results.append(summary)
+            if failed:
+                summary['verdict'] = 'SKIPPED'
+                continue
+
+            if tier['name'] == 'small':
+                inputs = [case.get('input', {}) for case in job.get('test_cases', [])]
+                expected = [case.get('expected') for case in job.get('test_cases', [])]
+            else:
+                inputs = _guaranteed_inputs(job['schema'], tier['n'],
+                                            (tier['seed'] + i for i in range(tier['cases'])))
+                expected = None
+
+            verdict = 'OK'
+            budget_used = 0.0
+            for i, input_data in enumerate(inputs):
+                budget = tier['budget_seconds']
+                reference_input = reference_outcome = None
+                if expected is None and reference:
+                    # The reference's answer on the same input is the expected output,
+                    # and without a known complexity its time sets the budget
+                    reference_input = copy.deepcopy(input_data)
+                    reference_outcome = _run_tier_case(reference, reference_input,
+                                                       max(budget, job.get('reference_seconds', 0)))
+                    if reference_outcome['verdict'] == 'OK' and tier.get('reference_slack'):
+                        budget = min(tier['base_seconds'] + tier['reference_slack'] * reference_outcome['seconds'],
+                                     tier['max_budget_seconds'])
+                budget_used = max(budget_used, budget)
+                outcome = _run_tier_case(method, input_data, budget)
+                summary['cases'] += 1
+                summary['max_seconds'] = max(summary['max_seconds'], outcome['seconds'])
+                if outcome['verdict'] == 'OK':
+                    compared = None
+                    if expected is not None and expected[i] is not None:
+                        output = outcome['result']
+                        if (comparator or {}).get('name') == 'in_place':
+                            output = modified_argument(input_data, comparator)
+                        compared = (output, expected[i])
+                    elif reference_outcome is not None and reference_outcome['verdict'] == 'OK':
+                        output, wanted, _ = _compared_outputs(outcome['result'], reference_outcome['result'],
+                                                              input_data, reference_input, comparator)
+                        compared = (output, wanted)
+                    if compared is not None:
+                        summary['checked'] += 1
+                        if not results_match(compared[0], compared[1], comparator):
+                            outcome['verdict'] = 'WA'
+                if outcome['verdict'] != 'OK':
+                    verdict = outcome['verdict']
+                    summary['failed_case'] = i + 1
+                    if outcome.get('error'):
+                        summary['error'] = outcome['error']
+                    break
+            if verdict == 'OK' and summary['checked']:
+                verdict = 'AC'
+            if budget_used:
+                summary['budget_seconds'] = round(budget_used, 3)
+            summary['verdict'] = verdict
+            failed = verdict not in ('AC', 'OK')
+    finally:
+        sys.stdout = saved_stdout
+    return {'tiers': tier_results}
+
+
+def run_fuzz(job: Dict, emit) -> Dict:
+    """
+    Differential fuzzing of user code against a reference solution.
+
+    Inputs come from job['schema'] with sizes growing from 1 to max_n, so the
+    first divergence found tends to be small. Each solution gets its own copy
+    of every input, passed positionally since parameter names may differ.
+    Outputs are judged by job['comparator']; for in-place problems, or when
+    both solutions return None, the modified arguments are compared instead
+    (see _compared_outputs). Inputs that break the question's guarantees
+    (e.g. two sum with no or several answers) or that the reference raises on
+    are skipped as outside the problem's constraints.
+
+    Job fields: code, entry_point, reference, reference_entry_point, schema,
+    comparator, seed, max_cases (5000), max_n (12), budget_seconds (3.0) and
+    case_seconds (1.0).
+
+    Returns:
+        {'cases', 'skipped', 'seconds', 'stopped', 'divergence'}, or
+        {'error': traceback} when either solution cannot be loaded
+    """
+    try:
+        method = load_solution(job['code'], job['entry_point'])
+    except BaseException:
+        return {'error': _format_exception()}
+    try:
+        reference = load_solution(job['reference'], job['reference_entry_point'])
+    except BaseException:
+        return {'error': 'Reference solution could not be loaded:\n' + _format_exception()}
+
+    schema = job['schema']
+    seed = job.get('seed', 0)
+    max_n = job.get('max_n', 12)
+    budget = job.get('budget_seconds', 3.0)
+    case_seconds = job.get('case_seconds', 1.0)
+    comparator = job.get('comparator')
+    rng = random.Random(seed)
+
+    cases = skipped = 0
+    divergence = None
+    stopped = 'max_cases'
+    started = time.perf_counter()
+    saved_stdout = sys.stdout
+    try:
+        for i in range(job.get('max_cases', 5000)):
+            if time.perf_counter() - started >= budget:
+                stopped = 'budget'
+                break
+            n = rng.randint(1, min(max_n, 1 + i // FUZZ_SIZE_STEP))
+            try:
+                input_data = input_generators.generate_input(schema, n, f'{seed}:{i}')
+            except input_generators.GuaranteeNotMet:
+                skipped += 1
+                continue
+            sys.stdout = io.StringIO()  # Prints are discarded, one buffer per case
+
+            reference_args = copy.deepcopy(list(input_data.values()))
+            try:
+                with _time_limit(case_seconds):
+                    expected = reference(*reference_args)
+            except (Exception, TimeLimitExceeded):
+                skipped += 1
+                continue
+
+            user_args = copy.deepcopy(list(input_data.values()))
+            outcome = _run_tier_case(method, user_args, case_seconds)
+            cases += 1
+            if outcome['verdict'] == 'OK':
+                output, expected, in_place = _compared_outputs(
+                    outcome['result'], expected, dict(zip(input_data, user_args)),
+                    dict(zip(input_data, reference_args)), comparator)
+                if results_match(output, expected, comparator):
+                    continue
+                divergence = {'output': output, 'in_place': in_place}
+            else:
+                error = {'TLE': f'Time limit exceeded ({case_seconds:g} s)', 'MLE': 'MemoryError'}
+                divergence = {'error': outcome.get('error') or error.get(outcome['verdict'], outcome['verdict'])}
+            divergence.update(case=cases, n=n, input=input_data, expected=expected)
+            stopped = 'divergence'
+            break
+    finally:
+        sys.stdout = saved_stdout
+    return {
+        'cases': cases,
+        'skipped': skipped,
+        'seconds': round(time.perf_counter() - started, 3),
+        'stopped': stopped,
+        'divergence': divergence
+    }
+
+
+def _pin_to_one_cpu():
+    """
+    Pin this process to one of its allowed CPUs for stable timings.
+
+    Workers pick different CPUs (by pid) so concurrent benchmarks do not share one.
+
+    Returns:
+        (cpu, previous affinity), or (None, None) where affinity is unsupported
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return None, None
+    try:
+        allowed = sorted(os.sched_getaffinity(0))
+        cpu = allowed[os.getpid() % len(allowed)]
+        os.sched_setaffinity(0, {cpu})
+        return cpu, set(allowed)
+    except OSError:
+        return None, None
+
+
+def _fresh_copy(args: List) -> List:
+    """A deep copy of generated arguments; for plain data a pickle round trip is a few times faster than deepcopy."""
+    return pickle.loads(pickle.dumps(args, pickle.HIGHEST_PROTOCOL))
+
+
+def _timed_call(method, args: List, limit: float) -> float:
+    """Seconds one call takes on a fresh copy of args (the copy is not timed)."""
+    call_args = _fresh_copy(args)
+    start = time.perf_counter()
+    with _time_limit(limit):
+        method(*call_args)
+    return time.perf_counter() - start
+
+
+def _cpu_limited(limit: float) -> float:
+    """
+    A per-call time limit cut down to the CPU allowance left (less the
+    reserve). Wall time never runs slower than CPU time, so a call stopped by
+    this limit raises TimeLimitExceeded before the worker gets SIGXCPU.
+    """
+    return min(limit, cpu_remaining() - BENCHMARK_CPU_RESERVE_SECONDS)
+
+
+class CpuAllowanceSpent(Exception):
+    """The job's CPU allowance ran out before a benchmark phase finished."""
+
+
+def _benchmark_call(method, args: List, call_limit: float) -> float:
+    """
+    _timed_call within the CPU allowance left. Raises CpuAllowanceSpent when
+    the allowance, not call_limit, was what stopped (or would stop) the call.
+    """
+    limit = _cpu_limited(call_limit)
+    if limit <= 0:
+        raise CpuAllowanceSpent()
+    try:
+        return _timed_call(method, args, limit)
+    except TimeLimitExceeded:
+        if limit < call_limit:
+            raise CpuAllowanceSpent()
+        raise
+
+
+def _benchmark_peak_memory(method, args: List, times: List[float], call_limit: float) -> Optional[float]:
+    """Peak memory of one traced call, or None when it would not fit in the CPU allowance left."""
+    limit = _cpu_limited(TRACEMALLOC_SLOWDOWN * call_limit)
+    if not times or TRACEMALLOC_SLOWDOWN * statistics.median(times) >= limit:
+        return None
+    try:
+        with _time_limit(limit):
+            return _peak_memory(method, _fresh_copy(args))
+    except TimeLimitExceeded:
+        return None
+
+
+def _median_interval(times: List[float]):
+    """
+    Distribution-free confidence interval of the median: the order statistics
+    at ranks n/2 -/+ z*sqrt(n)/2, so outliers widen it without moving it.
+    """
+    ordered = sorted(times)
+    n = len(ordered)
+    half_width = BENCHMARK_CONFIDENCE_Z * math.sqrt(n) / 2
+    low = max(0, round(n / 2 - half_width) - 1)
+    high = min(n - 1, round(n / 2 + 1 + half_width) - 1)
+    return ordered[low], ordered[high]
+
+
+def _benchmark_stats(times: List[float], peak_memory_kb: Optional[float]) -> Dict:
+    if len(times) > 1:
+        q1, median, q3 = statistics.quantiles(times, n=4, method='inclusive')
+    else:
+        q1 = median = q3 = times[0]
+    ci_low, ci_high = _median_interval(times)
+    return {
+        'median_ms': round(median * 1000, 4),
+        'q1_ms': round(q1 * 1000, 4),
+        'q3_ms': round(q3 * 1000, 4),
+        'iqr_ms': round((q3 - q1) * 1000, 4),
+        'ci_low_ms': round(ci_low * 1000, 4),
+        'ci_high_ms': round(ci_high * 1000, 4),
+        'runs': len(times),
+        'peak_memory_kb': peak_memory_kb
+    }
+
+
+def run_benchmark(job: Dict, emit) -> Dict:
+    """
+    Time user code against a reference solution on the same seeded input.
+
+    The input size is the first of job['sizes'] at which the reference takes
+    target_seconds, so both sides are measured well above timer resolution.
+    After warmup calls, the two are timed alternately, in swapped order every
+    round (so drift hits both equally), with the garbage collector off and the
+    process pinned to one CPU, until repeats are done or the timed calls have
+    used the budget; input copies, calibration and warmup do not count
+    against it. Each side's median comes with a ~95% confidence interval
+    (_median_interval). Peak allocation comes from one extra
+    tracemalloc-traced call each, when it fits.
+
+    Every phase stays within the job's CPU allowance (cpu_remaining): when it
+    runs short, sampling stops and the statistics gathered so far are
+    returned with stopped='cpu'.
+
+    Job fields: code, entry_point, reference, reference_entry_point, schema,
+    seed, sizes, target_seconds (0.02), warmup (3), repeats (60),
+    budget_seconds (5.0) and call_seconds (2.0, limit per call).
+
+    Returns:
+        {'n', 'user': stats, 'reference': stats, 'pinned_cpu', 'stopped'},
+        where stats are {'median_ms', 'q1_ms', 'q3_ms', 'iqr_ms', 'ci_low_ms',
+        'ci_high_ms', 'runs', 'peak_memory_kb'} and a side without timings has none; 'user_error'
+        instead of 'user' if the user's code fails (plus 'user_timeout_seconds'
+        if it was too slow); 'reference_error' if the reference fails on the
+        chosen input; {'error': traceback} when either solution cannot be loaded
+    """
+    try:
+        method = load_solution(job['code'], job['entry_point'])
+    except BaseException:
+        return {'error': _format_exception()}
+    try:
+        reference = load_solution(job['reference'], job['reference_entry_point'])
+    except BaseException:
+        return {'error': 'Reference solution could not be loaded:\n' + _format_exception()}
+
+    schema = job['schema']
+    seed = job.get('seed', 0)
+    call_limit = job.get('call_seconds', 2.0)
+    budget = job.get('budget_seconds', 5.0)
+    repeats = max(MIN_BENCHMARK_REPEATS, job.get('repeats', 60))
+
+    saved_stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    cpu, previous_affinity = _pin_to_one_cpu()
+    gc_was_enabled = gc.isenabled()
+    started = time.perf_counter()
+    reply = {'pinned_cpu': cpu, 'stopped': 'repeats'}
+    try:
+        # Calibrate the input size on the reference, leaving CPU for the
+        # minimum runs of both sides at the chosen size
+        args, n = None, None
+        for size in job.get('sizes', []):
+            candidate = list(input_generators.generate_input(schema, size, seed).values())
+            limit = min(call_limit, (cpu_remaining() - BENCHMARK_CPU_RESERVE_SECONDS) / (2 * MIN_BENCHMARK_REPEATS))
+            if limit <= 0:
+                break
+            try:
+                reference_seconds = _timed_call(reference, candidate, limit)
+            except (Exception, TimeLimitExceeded):
+                break
+            args, n = candidate, size
+            if reference_seconds >= job.get('target_seconds', 0.02):
+                break
+        if args is None:
+            return {'error': 'The reference solution could not run on generated inputs.'}
+        reply['n'] = n
+
+        user_times, reference_times = [], []
+        timed = 0.0
+        gc.disable()
+        try:
+            solution = None
+            try:
+                for _ in range(job.get('warmup', 3)):
+                    for solution in (reference, method):
+                        _benchmark_call(solution, args, call_limit)
+                for i in range(repeats):
+                    pair = [(method, user_times), (reference, reference_times)]
+                    for solution, times in (pair if i % 2 == 0 else pair[::-1]):
+                        times.append(_benchmark_call(solution, args, call_limit))
+                        timed += times[-1]
+                    if len(user_times) >= MIN_BENCHMARK_REPEATS and timed >= budget:
+                        reply['stopped'] = 'budget'
+                        break
+                solution = None
+            except CpuAllowanceSpent:
+                reply['stopped'] = 'cpu'
+            except TimeLimitExceeded:
+                if solution is reference:
+                    reply['reference_error'] = f'Took longer than {call_limit:g} s on an input of size {n}'
+                else:
+                    reply['user_error'] = f'Took longer than {call_limit:g} s on an input of size {n}'
+                    reply['user_timeout_seconds'] = call_limit
+            except Exception as e:
+                reply['reference_error' if solution is reference else 'user_error'] = f'{type(e).__name__}: {e}'
+            # If the user's code gave up early the reference is still timed, so a
+            # timeout can be reported as a lower bound on the ratio
+            if 'user_error' in reply:
+                try:
+                    while len(reference_times) < MIN_BENCHMARK_REPEATS:
+                        reference_times.append(_benchmark_call(reference, args, call_limit))
+                except CpuAllowanceSpent:
+                    reply['stopped'] = 'cpu'
+                except TimeLimitExceeded:
+                    reply['reference_error'] = f'Took longer than {call_limit:g} s on an input of size {n}'
+                except Exception as e:
+                    reply['reference_error'] = f'{type(e).__name__}: {e}'
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        if reference_times:
+            reply['reference'] = _benchmark_stats(
+                reference_times, _benchmark_peak_memory(reference, args, reference_times, call_limit))
+        if user_times and 'user_error' not in reply:
+            reply['user'] = _benchmark_stats(
+                user_times, _benchmark_peak_memory(method, args, user_times, call_limit))
+    finally:
+        if previous_affinity is not None:
+            os.sched_setaffinity(0, previous_affinity)
+        sys.stdout = saved_stdout
+    reply['seconds'] = round(time.perf_counter() - started, 3)
+    return reply
+
+
+JOB_HANDLERS = {
+    'tests': run_tests,
+    'complexity': run_complexity_probe,
+    'stress': run_stress,
+    'fuzz': run_fuzz,
+    'benchmark': run_benchmark
+}
+
+
+def run_job(job: Dict, emit=None) -> Dict:
+    """
+    Dispatch a job to its handler; SystemExit from user code is reported, not obeyed.
+
+    emit(kind, data) receives streamed items (test case results) as they are
+    produced. Without it they are collected into the reply's 'results'.
+    """
+    handler = JOB_HANDLERS.get(job.get('kind', 'tests'))
+    if handler is None:
+        return {'error': f"Unknown job kind: {job.get('kind')}"}
+    if job.get('harness', HARNESS_VERSION) != HARNESS_VERSION:
+        return {'error': f"Harness version mismatch: server {job.get('harness')}, sandbox {HARNESS_VERSION}"}
+
+    collected = []
+    if emit is None:
+        emit = lambda kind, data: collected.append(data)
+    try:
+        reply = handler(job, emit)
+    except SystemExit as e:
+        reply = {'error': f'Code called exit({e.code if e.code is not None else ""})'}
+    if collected:
+        reply['results'] = collected
+    return reply
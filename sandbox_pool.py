@@ -0,0 +1,546 @@
+"""
+Pool of pre-started sandbox worker processes for running user code.
+Workers are spawned ahead of time so a run does not pay interpreter startup;
+each forks a fresh child per job (see sandbox_worker), so no job can affect
+another. Workers are recycled after a fixed number of jobs, on timeout, on
+crash or when the job is cancelled.
+At most `size` jobs run at once; up to `max_waiting` more may queue for a
+free worker, and anything beyond that is rejected with SandboxBusy.
+Large test suites can be sharded across the workers that are idle at the time.
+"""
+import atexit
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List
+
+from ipc_frames import FrameDecoder, FrameError
+from sandbox_harness import is_failure, summarize
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+
+class SandboxTimeout(Exception):
+    """Raised when a job does not finish before its deadline."""
+
+
+class SandboxCrashed(Exception):
+    """Raised when a worker process dies while running a job."""
+
+
+class SandboxBusy(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+class SandboxCancelled(Exception):
+    """Raised when a job is cancelled while queued or running."""
+
+
+# How often a blocked run checks its cancel event (seconds)
+CANCEL_POLL_SECONDS = 0.05
+
+# A suite is only split when every shard gets at least this many cases
+MIN_CASES_PER_SHARD = 8
+
+
+class SandboxWorker:
+    """
+    A single pre-started runner process, which forks one child per job.
+
+    Jobs go in as JSON lines on stdin. Results come back as frames on a
+    dedicated pipe (see ipc_frames); the process's stdout/stderr is a separate
+    console stream, of which at most max_console_bytes are kept per job.
+    The worker leads its own process group, so killing it also kills the
+    child running user code.
+    """
+
+    def __init__(self, python_executable: str, limits: Dict = None, max_console_bytes: int = 65536):
+        self.max_console_bytes = max_console_bytes
+        result_read, result_write = os.pipe()
+        # The worker applies its own rlimits after startup (see sandbox_worker.apply_limits)
+        self.process = subprocess.Popen(
+            [python_executable, '-u', WORKER_SCRIPT, json.dumps(limits or {})],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            pass_fds=(result_write,),
+            cwd=os.path.dirname(WORKER_SCRIPT),
+            env=dict(os.environ, SANDBOX_RESULT_FD=str(result_write)),
+            start_new_session=True
+        )
+        os.close(result_write)
+        self._result_fd = result_read
+        self._decoder = FrameDecoder()
+        self.jobs_run = 0
+        # False while a job is in flight; a child crash leaves the worker ready for the next
+        self.between_jobs = True
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, job: Dict, timeout: float, on_result: Callable[[Dict], None] = None,
+            cancel: threading.Event = None) -> Dict:
+        """
+        Send one job to the worker and wait for its reply.
+
+        Result frames are decoded as they arrive; each streamed test case result
+        is passed to on_result and collected into the reply's 'results'. Setting
+        cancel raises SandboxCancelled; the worker must then be killed.
+        """
+        deadline = time.monotonic() + timeout
+        self.jobs_run += 1
+        self.between_jobs = False
+        try:
+            self.process.stdin.write((json.dumps(job) + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError):
+            raise SandboxCrashed('Sandbox process is not accepting jobs')
+
+        console_fd = self.process.stdout.fileno()
+        console = bytearray()
+        console_dropped = 0
+
+        def read_console() -> bool:
+            """Drain one chunk of console output, keeping at most max_console_bytes."""
+            nonlocal console_dropped
+            chunk = os.read(console_fd, 65536)
+            room = max(0, self.max_console_bytes - len(console))
+            console.extend(chunk[:room])
+            console_dropped += max(0, len(chunk) - room)
+            return bool(chunk)
+
+        results = []
+        reply = None
+        watched = [self._result_fd, console_fd]
+        while reply is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SandboxTimeout()
+            if cancel is not None:
+                if cancel.is_set():
+                    raise SandboxCancelled()
+                remaining = min(remaining, CANCEL_POLL_SECONDS)
+            ready, _, _ = select.select(watched, [], [], remaining)
+            # Keep draining the console so the worker never blocks on a full pipe
+            if console_fd in ready and not read_console():
+                watched.remove(console_fd)
+            if self._result_fd in ready:
+                chunk = os.read(self._result_fd, 65536)
+                if not chunk:
+                    self._crashed()
+                try:
+                    messages = self._decoder.feed(chunk)
+                except FrameError as e:
+                    raise SandboxCrashed(f'Corrupt result channel: {e}')
+                for message in messages:
+                    if message.get('type') == 'result':
+                        results.append(message['data'])
+                        if on_result is not None:
+                            on_result(message['data'])
+                    elif message.get('type') == 'reply':
+                        reply = message['data']
+                    elif message.get('type') == 'crashed':
+                        # The job's child died; the worker itself is fine
+                        self.between_jobs = True
+                        raise SandboxCrashed(message['data']['error'])
+
+        # Console bytes written just before the reply may still be in the pipe
+        while console_fd in watched and select.select([console_fd], [], [], 0)[0]:
+            if not read_console():
+                break
+
+        self.between_jobs = True
+        if results:
+            reply['results'] = results
+        if console:
+            reply['console'] = console.decode('utf-8', errors='replace')
+            if console_dropped:
+                reply['console'] += f'\n... ({console_dropped} more bytes truncated)'
+        return reply
+
+    def _crashed(self):
+        returncode = self.process.wait()
+        raise SandboxCrashed(f'Sandbox process exited unexpectedly (exit code {returncode})')
+
+    def kill(self):
+        try:
+            # The whole group: the worker and the child running the current job
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (AttributeError, OSError):
+            pass
+        try:
+            self.process.kill()
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+        try:
+            os.close(self._result_fd)
+        except OSError:
+            pass
+
+    def detach(self):
+        """Close this process's ends of the worker's pipes without killing it (it belongs to a parent process)."""
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        try:
+            os.close(self._result_fd)
+        except OSError:
+            pass
+
+
+class SandboxPool:
+    """Hands out pre-warmed sandbox workers, one job at a time per worker."""
+
+    def __init__(self, size: int = None, max_jobs_per_worker: int = 50,
+                 python_executable: str = None, max_waiting: int = None,
+                 max_queue_wait: float = 5.0, cpu_seconds: int = 5, max_cpu_seconds: int = 30,
+                 memory_mb: int = 512, max_open_files: int = 64, max_processes: int = 0):
+        self.size = size or min(4, os.cpu_count() or 1)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.python_executable = python_executable or sys.executable
+        self.max_waiting = self.size * 4 if max_waiting is None else max_waiting
+        self.max_queue_wait = max_queue_wait
+
+        # Per-sandbox rlimits; CPU seconds apply to each job, not the worker's lifetime.
+        # A job may ask for its own CPU allowance ('cpu_seconds') up to max_cpu_seconds.
+        self.max_cpu_seconds = max_cpu_seconds
+        self.limits = {
+            'cpu_seconds': cpu_seconds,
+            'memory_mb': memory_mb,
+            'max_open_files': max_open_files,
+            'max_processes': max_processes
+        }
+
+        self._idle: List[SandboxWorker] = []
+        self._lock = threading.Lock()
+        self._admission = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._started = False
+
+        self.workers_spawned = 0
+        self.workers_recycled = 0
+        self.jobs_completed = 0
+        self.rejected = 0
+        self.sharded_runs = 0
+        self.shards_run = 0
+        self._queue_waits = deque(maxlen=256)  # seconds waiting for a worker
+        self._run_times = deque(maxlen=256)  # seconds spent executing
+
+    def start(self):
+        """Spawn the idle workers so the first runs find a warm interpreter."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            for _ in range(self.size):
+                self._idle.append(self._spawn())
+        print(f"✅ Sandbox pool started with {self.size} workers")
+
+    def run(self, job: Dict, timeout: float = 10, on_result: Callable[[Dict], None] = None,
+            cancel: threading.Event = None) -> Dict:
+        """
+        Run a job on an idle worker.
+
+        Args:
+            job: sandbox_harness job, e.g. {'kind': 'tests', 'code', 'entry_point', 'test_cases'}
+            timeout: Wall-clock limit in seconds
+            on_result: Called with each test case result as soon as it arrives
+            cancel: Set from another thread to abandon the job (the worker is replaced)
+
+        Returns:
+            The harness reply ({'results': [...]} or {'error': message}) plus
+            'timing': {'queue_wait_ms', 'execution_ms'} and, if the code wrote
+            to the process's stdout/stderr directly, 'console'
+
+        Raises:
+            SandboxBusy: the wait queue is full or no worker freed up in time
+            SandboxCancelled: cancel was set while the job was queued or running
+        """
+        if not self._started:
+            self.start()
+
+        queued_at = time.monotonic()
+        self._acquire_slot(cancel)
+        started_at = time.monotonic()
+        self._queue_waits.append(started_at - queued_at)
+        try:
+            reply = self._run_on_slot(job, timeout, on_result, cancel)
+        finally:
+            self._release_slot()
+            self._run_times.append(time.monotonic() - started_at)
+
+        reply['timing'] = {
+            'queue_wait_ms': round(1000 * (started_at - queued_at), 1),
+            'execution_ms': round(1000 * (time.monotonic() - started_at), 1)
+        }
+        return reply
+
+    def run_sharded(self, job: Dict, timeout: float = 10, on_result: Callable[[Dict], None] = None,
+                    cancel: threading.Event = None, max_shards: int = None) -> Dict:
+        """
+        Run a 'tests' job split across several workers at once.
+
+        The suite is dealt into up to max_shards shards (default: pool size),
+        but only as many as there are workers free and cores idle right now,
+        and never fewer than MIN_CASES_PER_SHARD cases each, so a busy pool or
+        machine degrades to a plain run(). Each shard has its own timeout; a shard that times out or
+        crashes fails only its own cases. Results keep their original case
+        numbers and the reply lists them in suite order; on_result sees them
+        as they finish. With fail_fast, the first failure stops every shard.
+
+        Returns:
+            Same reply as run(), with 'timing' also giving the shard count and
+            'failed_shards' counting shards that timed out or crashed
+        """
+        test_cases = job.get('test_cases', [])
+        wanted = min(max_shards or self.size, len(test_cases) // MIN_CASES_PER_SHARD,
+                     self._idle_cores())
+        if wanted <= 1:
+            return self.run(job, timeout, on_result, cancel)
+        if not self._started:
+            self.start()
+
+        queued_at = time.monotonic()
+        self._acquire_slot(cancel)
+        shard_count = 1 + self._acquire_free_slots(wanted - 1)
+        started_at = time.monotonic()
+        self._queue_waits.append(started_at - queued_at)
+        self.sharded_runs += 1
+        self.shards_run += shard_count
+
+        # Deal cases round-robin so every shard starts with its share of the
+        # cases ordered first (previously failing ones)
+        order = list(job.get('order') or range(len(test_cases)))
+        shards = [order[number::shard_count] for number in range(shard_count)]
+        stop = threading.Event()
+        lock = threading.Lock()
+        collected: List[Dict] = []
+        outcomes: List[Dict] = [{} for _ in shards]
+
+        def forward(indices: List[int], result: Dict):
+            # Shard-local case numbers back to positions in the full suite
+            result['test_case'] = indices[result['test_case'] - 1] + 1
+            with lock:
+                collected.append(result)
+                if job.get('fail_fast') and is_failure(result):
+                    stop.set()
+                if on_result is not None:
+                    on_result(result)
+
+        def run_shard(number: int, indices: List[int]):
+            shard_job = dict(job, test_cases=[test_cases[i] for i in indices])
+            shard_job.pop('order', None)
+            try:
+                outcomes[number] = self._run_on_slot(shard_job, timeout,
+                                                     lambda result: forward(indices, result), stop)
+            except SandboxCancelled:
+                outcomes[number] = {'cancelled': True}
+            except SandboxTimeout:
+                outcomes[number] = {'failure': f'Timed out after {timeout:g} s (shard {number + 1} of {shard_count})'}
+            except Exception as e:
+                outcomes[number] = {'failure': str(e) or type(e).__name__}
+            finally:
+                self._release_slot()
+
+        threads = [threading.Thread(target=run_shard, args=(number, indices), daemon=True)
+                   for number, indices in enumerate(shards)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(CANCEL_POLL_SECONDS)
+                if cancel is not None and cancel.is_set():
+                    stop.set()
+        self._run_times.append(time.monotonic() - started_at)
+        if cancel is not None and cancel.is_set():
+            raise SandboxCancelled()
+
+        load_errors = [outcome['error'] for outcome in outcomes if 'error' in outcome]
+        if load_errors:
+            # Every shard loads the same code, so any load error is the error
+            reply = {'error': load_errors[0]}
+        else:
+            reported = {result['test_case'] for result in collected}
+            failed_shards = 0
+            for number, outcome in enumerate(outcomes):
+                if 'failure' not in outcome:
+                    continue
+                failed_shards += 1
+                for index in shards[number]:
+                    if index + 1 not in reported:
+                        collected.append({
+                            'test_case': index + 1,
+                            'passed': False,
+                            'error': outcome['failure'],
+                            'input': test_cases[index].get('input', {})
+                        })
+            collected.sort(key=lambda result: result['test_case'])
+            reply = {
+                'results': collected,
+                'totals': summarize(collected),
+                'skipped_cases': len(test_cases) - len(collected)
+            }
+            if failed_shards:
+                reply['failed_shards'] = failed_shards
+        console = '\n'.join(outcome['console'] for outcome in outcomes if outcome.get('console'))
+        if console:
+            reply['console'] = console
+
+        reply['timing'] = {
+            'queue_wait_ms': round(1000 * (started_at - queued_at), 1),
+            'execution_ms': round(1000 * (time.monotonic() - started_at), 1),
+            'shards': shard_count
+        }
+        return reply
+
+    def _run_on_slot(self, job: Dict, timeout: float, on_result: Callable[[Dict], None] = None,
+                     cancel: threading.Event = None) -> Dict:
+        """Run a job on a worker; the caller holds an admission slot."""
+        if job.get('cpu_seconds'):
+            job = dict(job, cpu_seconds=min(job['cpu_seconds'], self.max_cpu_seconds))
+        worker = self._checkout()
+        healthy = False
+        try:
+            reply = worker.run(job, timeout, on_result, cancel)
+            healthy = True
+            self.jobs_completed += 1
+        except SandboxCrashed:
+            healthy = worker.between_jobs
+            raise
+        finally:
+            self._checkin(worker, healthy)
+        return reply
+
+    def _acquire_slot(self, cancel: threading.Event = None):
+        """Wait for a free worker slot, or raise SandboxBusy (SandboxCancelled if cancel is set)."""
+        with self._admission:
+            if self._active >= self.size and self._waiting >= self.max_waiting:
+                self.rejected += 1
+                raise SandboxBusy('All sandboxes are busy and the queue is full')
+            self._waiting += 1
+            try:
+                deadline = time.monotonic() + self.max_queue_wait
+                while self._active >= self.size:
+                    if cancel is not None and cancel.is_set():
+                        raise SandboxCancelled()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise SandboxBusy('Timed out waiting for a free sandbox')
+                    if cancel is not None:
+                        remaining = min(remaining, CANCEL_POLL_SECONDS)
+                    self._admission.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._active += 1
+
+    @staticmethod
+    def _idle_cores() -> int:
+        """Cores not already busy by the 1-minute load average (all of them if unknown)."""
+        cores = os.cpu_count() or 1
+        try:
+            load = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            return cores
+        return max(1, cores - int(load))
+
+    def _acquire_free_slots(self, count: int) -> int:
+        """Take up to count slots that are free right now, without waiting; returns how many."""
+        with self._admission:
+            # Queued jobs come first: only slots nobody is waiting for are taken
+            granted = max(0, min(count, self.size - self._active - self._waiting))
+            self._active += granted
+            return granted
+
+    def _release_slot(self):
+        with self._admission:
+            self._active -= 1
+            self._admission.notify()
+
+    def _spawn(self) -> SandboxWorker:
+        self.workers_spawned += 1
+        return SandboxWorker(self.python_executable, self.limits)
+
+    def _checkout(self) -> SandboxWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.kill()
+                self.workers_recycled += 1
+            return self._spawn()
+
+    def _checkin(self, worker: SandboxWorker, healthy: bool):
+        if healthy and worker.is_alive() and worker.jobs_run < self.max_jobs_per_worker:
+            with self._lock:
+                self._idle.append(worker)
+            return
+
+        # Timed out, crashed or used up: replace it so the pool stays warm
+        worker.kill()
+        with self._lock:
+            self.workers_recycled += 1
+            self._idle.append(self._spawn())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            idle = len(self._idle)
+        with self._admission:
+            active, waiting = self._active, self._waiting
+        waits = sorted(self._queue_waits)
+        runs = sorted(self._run_times)
+        return {
+            'size': self.size,
+            'idle': idle,
+            'active': active,
+            'waiting': waiting,
+            'max_waiting': self.max_waiting,
+            'rejected': self.rejected,
+            'limits': dict(self.limits, max_cpu_seconds=self.max_cpu_seconds),
+            'workers_spawned': self.workers_spawned,
+            'workers_recycled': self.workers_recycled,
+            'jobs_completed': self.jobs_completed,
+            'sharded_runs': self.sharded_runs,
+            'shards_run': self.shards_run,
+            'queue_wait_ms_avg': round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+            'queue_wait_ms_p95': round(1000 * waits[int(len(waits) * 0.95)], 1) if waits else 0.0,
+            'execution_ms_avg': round(1000 * sum(runs) / len(runs), 1) if runs else 0.0,
+            'execution_ms_p95': round(1000 * runs[int(len(runs) * 0.95)], 1) if runs else 0.0
+        }
+
+    def reset_after_fork(self):
+        """
+        Start from an empty pool in a freshly forked server process. Workers
+        inherited from the parent stay the parent's: only our pipe ends are closed.
+        """
+        for worker in self._idle:
+            worker.detach()
+        self._idle = []
+        self._lock = threading.Lock()
+        self._admission = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._started = False
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+            self._started = False
+        for worker in workers:
+            worker.kill()
+
+
+# Global instance. SANDBOX_POOL_SIZE sets the workers per server process.
+sandbox_pool = SandboxPool(size=int(os.environ.get('SANDBOX_POOL_SIZE', 0)) or None)
+atexit.register(sandbox_pool.shutdown)
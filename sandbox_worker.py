@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Sandbox worker process for the code runner pool.
+Reads jobs from stdin (one JSON object per line). The worker never runs user
+code itself: it is a pre-imported template that forks a fresh child for every
+job, so nothing a job does to the interpreter (patched modules, globals,
+threads, open files) outlives it. The child runs the job through the test
+harness and sends length-prefixed frames back on a pipe of its own. The
+worker judges test results itself (the child only reports outputs), forwards
+them on the dedicated result fd, whose number it keeps out of the child's
+reach, and reports a child that dies without a reply. The worker's own
+stdout/stderr only ever carry console output.
+"""
+
+import gc
+import io
+import json
+import math
+import os
+import signal
+import sys
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Imported (and byte-compiled) once per worker, then shared by every child
+import sandbox_harness
+from ipc_frames import encode_frame, FrameDecoder, FrameError
+from sandbox_harness import judge_case, is_failure, summarize
+
+
+def _set_limit(name: str, soft: int, hard: int = None):
+    """Lower one rlimit; skipped if unsupported on this platform."""
+    limit = getattr(resource, name, None)
+    if limit is None:
+        return
+    try:
+        resource.setrlimit(limit, (soft, soft if hard is None else hard))
+    except (ValueError, OSError):
+        pass
+
+
+def apply_limits(limits: dict, cpu_seconds: float = None):
+    """
+    Cap CPU time, address space, open files and child processes for one job's child.
+
+    Args:
+        limits: The pool's limits
+        cpu_seconds: The job's CPU allowance (capped by the pool); limits['cpu_seconds'] if not given
+    """
+    if resource is None:
+        return
+    cpu_seconds = cpu_seconds or limits.get('cpu_seconds')
+    if cpu_seconds:
+        # SIGXCPU at the allowance (a fresh child starts from zero), SIGKILL a second later
+        seconds = int(math.ceil(cpu_seconds))
+        _set_limit('RLIMIT_CPU', seconds, seconds + 1)
+    if limits.get('memory_mb'):
+        _set_limit('RLIMIT_AS', limits['memory_mb'] * 1024 * 1024)
+    if limits.get('max_open_files'):
+        _set_limit('RLIMIT_NOFILE', limits['max_open_files'])
+    if limits.get('max_processes') is not None:
+        _set_limit('RLIMIT_NPROC', limits['max_processes'])
+
+
+def run_job(job: dict, emit=None) -> dict:
+    """Run one harness job with its own stdin/stderr."""
+    saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+    sys.stdin = io.StringIO('')
+    sys.stderr = io.StringIO()
+    try:
+        return sandbox_harness.run_job(job, emit)
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+
+def send_frame(fd: int, message: dict):
+    """Write one complete frame to a result channel."""
+    try:
+        data = encode_frame(message)
+    except (FrameError, ValueError, TypeError) as e:
+        # e.g. an enormous or self-referencing return value: report it instead
+        test_case = (message.get('data') or {}).get('test_case', 0)
+        data = encode_frame({'type': message.get('type'),
+                             'data': {'test_case': test_case, 'error': f'Result could not be sent: {e}'}})
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _child_main(job: dict, limits: dict, inherited_fds, channel_fd: int):
+    """Run one job in a freshly forked child and exit; never returns."""
+    status = 1
+    try:
+        # Nothing the worker owns stays reachable: not the job pipe, not the result fd
+        for fd in inherited_fds:
+            os.close(fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        apply_limits(limits, job.get('cpu_seconds'))
+
+        def emit(kind, data):
+            send_frame(channel_fd, {'type': kind, 'data': data})
+
+        send_frame(channel_fd, {'type': 'reply', 'data': run_job(job, emit)})
+        status = 0
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        os._exit(status)
+
+
+def _exit_reason(status: int, cpu_used: float, cpu_seconds: float) -> str:
+    """Why a child ended without sending its reply."""
+    if os.WIFSIGNALED(status):
+        signum = os.WTERMSIG(status)
+        # The hard CPU limit is one second past the soft one: a SIGKILL there is the same overrun
+        if signum == getattr(signal, 'SIGXCPU', None) or \
+                (signum == signal.SIGKILL and cpu_seconds and cpu_used >= cpu_seconds):
+            return 'CPU time limit exceeded'
+        return f'Sandbox process was killed by signal {signum}'
+    return f'Sandbox process exited unexpectedly (exit code {os.WEXITSTATUS(status)})'
+
+
+class TestsChecker:
+    """
+    Judges a tests job's raw case results in the worker, where user code
+    cannot reach: whatever the child writes, only results for cases the job
+    asked for are accepted, once each, and verdicts and totals are computed
+    here from the job's own expected values. fail_fast is applied here too.
+    """
+
+    def __init__(self, job: dict):
+        self.job = job
+        self.test_cases = job.get('test_cases', [])
+        self.order = job.get('order') or range(len(self.test_cases))
+        self.pending = set(self.order)
+        self.results = []
+        self.stopped = False
+
+    def check(self, message: dict) -> dict:
+        """The judged result for one 'result' frame; FrameError if the job cannot have produced it."""
+        raw = message.get('data')
+        number = raw.get('test_case') if message.get('type') == 'result' and isinstance(raw, dict) else None
+        if type(number) is not int or number - 1 not in self.pending:
+            raise FrameError(f'Unexpected result frame for test case {number!r}')
+        self.pending.discard(number - 1)
+        result = judge_case(raw, self.test_cases[number - 1], self.job.get('execute_mode', False),
+                            self.job.get('comparator'))
+        self.results.append(result)
+        if self.job.get('fail_fast') and is_failure(result):
+            self.stopped = True
+        return result
+
+    def reply(self, child_reply: dict = None) -> dict:
+        """The job's reply: the child's load error if it had one, else totals of the judged results."""
+        if child_reply and 'error' in child_reply:
+            return {'error': str(child_reply['error'])}
+        return {'totals': summarize(self.results), 'skipped_cases': len(self.order) - len(self.results)}
+
+
+def run_in_child(job: dict, limits: dict, result_fd: int):
+    """
+    Fork a child for one job and forward its frames on result_fd until it
+    exits. Test results are judged on the way (see TestsChecker), and the
+    child is stopped at the first failure of a fail_fast job. A child that
+    dies without a reply is reported with a 'crashed' frame, so the pool can
+    tell it apart from the worker itself dying.
+    """
+    channel_read, channel_write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(channel_read)
+        _child_main(job, limits, (0, result_fd), channel_write)
+    os.close(channel_write)
+
+    checker = TestsChecker(job) if job.get('kind', 'tests') == 'tests' else None
+    decoder = FrameDecoder()
+    reply = failure = None
+    try:
+        while True:
+            chunk = os.read(channel_read, 65536)
+            if not chunk:
+                break
+            try:
+                for message in decoder.feed(chunk):
+                    if message.get('type') == 'reply':
+                        reply = message.get('data')
+                    elif checker is not None:
+                        send_frame(result_fd, {'type': 'result', 'data': checker.check(message)})
+                        if checker.stopped:
+                            break
+            except FrameError as e:
+                failure = f'Corrupt result channel: {e}'
+            if failure or (checker is not None and checker.stopped):
+                os.kill(pid, signal.SIGKILL)
+                break
+    finally:
+        os.close(channel_read)
+        _, status, usage = os.wait4(pid, 0)
+
+    if checker is not None and failure is None and (reply is not None or checker.stopped):
+        reply = checker.reply(reply if isinstance(reply, dict) and not checker.stopped else None)
+    if reply is not None and failure is None:
+        send_frame(result_fd, {'type': 'reply', 'data': reply})
+    else:
+        reason = failure or _exit_reason(status, usage.ru_utime + usage.ru_stime,
+                                         job.get('cpu_seconds') or limits.get('cpu_seconds'))
+        send_frame(result_fd, {'type': 'crashed', 'data': {'error': reason}})
+
+
+def main():
+    limits = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    # Taken out of the environment so a forked child never learns it
+    result_fd = int(os.environ.pop('SANDBOX_RESULT_FD', sys.stdout.fileno()))
+
+    # Keep a private handle on the job pipe
+    jobs = sys.stdin
+    if hasattr(gc, 'freeze'):
+        # Children then share the imported modules' pages instead of copying them
+        gc.freeze()
+
+    for line in jobs:
+        if not line.strip():
+            continue
+        run_in_child(json.loads(line), limits, result_fd)
+
+
+if __name__ == '__main__':
+    main()
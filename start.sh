@@ -16,8 +16,19 @@ echo "Server will start at: http://127.0.0.1:5000"
 echo ""
 echo "Note: LLM loads lazily on first hint request (~10-15 seconds)"
 echo "      Subsequent hints will be instant!"
+echo "      Set PRELOAD_LLM=1 to load it in the background at startup"
+echo "      (check http://127.0.0.1:5000/api/health for readiness)"
+echo "      Set WEB_THREADS to size the server (see gunicorn.conf.py)"
+echo "      Set DEV=1 for the Flask debug server with auto-reload"
 echo ""
 
 cd "$(dirname "$0")"
-python3 app.py
+if [ "$DEV" = "1" ]; then
+    python3 app.py
+elif python3 -c "import gunicorn" 2>/dev/null; then
+    gunicorn -c gunicorn.conf.py wsgi:application
+else
+    echo "⚠️  Gunicorn not installed (pip3 install -r requirements.txt); using the debug server"
+    python3 app.py
+fi
 
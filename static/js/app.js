@@ -81,6 +81,10 @@ function initEditor() {
         const hasContent = editor.getValue().trim().length > 0;
         document.getElementById('runBtn').disabled = !hasContent || !currentQuestion;
         document.getElementById('compileBtn').disabled = !hasContent || !currentQuestion;
+        document.getElementById('complexityBtn').disabled = !hasContent || !currentQuestion;
+        document.getElementById('stressBtn').disabled = !hasContent || !currentQuestion;
+        document.getElementById('fuzzBtn').disabled = !hasContent || !currentQuestion;
+        document.getElementById('benchmarkBtn').disabled = !hasContent || !currentQuestion;
         document.getElementById('hintBtn').disabled = !currentQuestion;
     });
     
@@ -267,6 +271,10 @@ async function selectQuestion(questionId) {
         document.getElementById('hintBtn').disabled = false;
         document.getElementById('resetBtn').disabled = false;
         document.getElementById('runBtn').disabled = editor.getValue().trim().length === 0;
+        document.getElementById('complexityBtn').disabled = editor.getValue().trim().length === 0;
+        document.getElementById('stressBtn').disabled = editor.getValue().trim().length === 0;
+        document.getElementById('fuzzBtn').disabled = editor.getValue().trim().length === 0;
+        document.getElementById('benchmarkBtn').disabled = editor.getValue().trim().length === 0;
         
         console.log('✅ Question selection complete');
     } catch (error) {
@@ -359,8 +367,8 @@ async function compileCode() {
     resultsPanel.innerHTML = '<div class="loading">⚡ Executing code... Please wait.</div>';
     
     try {
-        // First, do a quick syntax check
-        const compileResponse = await fetch('/api/compile', {
+        // Static check and execution in one request; the check never runs the code
+        const executeResponse = await fetch('/api/compile/execute', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -371,31 +379,11 @@ async function compileCode() {
             })
         });
         
-        const compileResult = await compileResponse.json();
-        
-        if (!compileResult.success) {
-            // Show syntax error
-            resultsPanel.innerHTML = `
-                <div class="error-message">
-                    <strong>❌ Syntax Error:</strong><br>
-                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${compileResult.error || 'Unknown error'}</pre>
-                </div>
-            `;
+        if (executeResponse.status === 503) {
+            resultsPanel.innerHTML = renderBusyMessage(await executeResponse.json());
             return;
         }
         
-        // If syntax is OK, execute the code
-        const executeResponse = await fetch('/api/execute', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                code: code,
-                question_id: currentQuestion.id
-            })
-        });
-        
         if (!executeResponse.ok) {
             const errorText = await executeResponse.text();
             throw new Error(`Server error: ${executeResponse.status} - ${errorText.substring(0, 200)}`);
@@ -403,7 +391,15 @@ async function compileCode() {
         
         const result = await executeResponse.json();
         
-        if (result.errors && result.errors.length > 0) {
+        if (result.compile && !result.compile.success) {
+            // Show the compile error
+            resultsPanel.innerHTML = `
+                <div class="error-message">
+                    <strong>❌ Compile Error:</strong><br>
+                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${escapeHtml(result.compile.error || 'Unknown error')}</pre>
+                </div>
+            `;
+        } else if (result.errors && result.errors.length > 0) {
             let errorHtml = result.errors.map(err => `
                 <div class="error-message">
                     <strong>Runtime Error:</strong><br>
@@ -444,6 +440,17 @@ async function compileCode() {
     }
 }
 
+// Render the "runner busy" notice returned with HTTP 503
+function renderBusyMessage(data) {
+    return `
+        <div class="error-message">
+            <strong>⏳ Code Runner Busy</strong><br><br>
+            ${escapeHtml(data.error || 'The code runner is busy right now.')}
+            ${data.retry_after ? `<br><small>Try again in about ${data.retry_after} second${data.retry_after > 1 ? 's' : ''}.</small>` : ''}
+        </div>
+    `;
+}
+
 // Render execution result (for immediate execution)
 function renderExecutionResult(result) {
     const consoleOutput = result.console_output && result.console_output.trim() 
@@ -462,6 +469,7 @@ function renderExecutionResult(result) {
                 <strong>Input:</strong> ${JSON.stringify(result.input)}<br>
                 <strong>Output:</strong> <code style="color: var(--success-color);">${JSON.stringify(result.output)}</code>
                 ${result.expected !== null && result.expected !== undefined ? `<br><strong>Expected:</strong> ${JSON.stringify(result.expected)}` : ''}
+                ${renderMetrics(result)}
                 ${consoleOutput}
             </div>
         </div>
@@ -476,21 +484,29 @@ async function runTests() {
     const resultsPanel = document.getElementById('resultsContent');
     const runBtn = document.getElementById('runBtn');
     
+    const failFastToggle = document.getElementById('failFastToggle');
+    const failFast = failFastToggle ? failFastToggle.checked : false;
+    
     // Show loading state
     setButtonLoading(runBtn, 'Running Tests...', '▶️ Run Tests');
     resultsPanel.innerHTML = '<div class="loading">🔄 Running tests... Please wait.</div>';
     
     try {
-        const response = await fetch('/api/run', {
+        const requestBody = JSON.stringify({
+            code: code,
+            test_cases: currentQuestion.test_cases || [],
+            question_id: currentQuestion.id,
+            mode: 'run',
+            fail_fast: failFast
+        });
+        
+        // Submit a background job; the server answers with a job id right away
+        const response = await fetch('/api/jobs', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({
-                code: code,
-                test_cases: currentQuestion.test_cases || [],
-                question_id: currentQuestion.id
-            })
+            body: requestBody
         });
         
         // Check if response is OK
@@ -503,7 +519,9 @@ async function runTests() {
             }
             
             // Handle specific error cases
-            if (response.status === 400 && errorData.error) {
+            if (response.status === 503 && errorData.busy) {
+                resultsPanel.innerHTML = renderBusyMessage(errorData);
+            } else if (response.status === 400 && errorData.error) {
                 let errorHtml = `
                     <div class="error-message">
                         <strong>❌ Cannot Run Tests</strong><br><br>
@@ -523,7 +541,31 @@ async function runTests() {
             return;
         }
         
-        const result = await response.json();
+        // Show each case as soon as it finishes (previously failing cases run first)
+        let streamed = 0;
+        resultsPanel.innerHTML = `
+            <div class="loading" id="liveTestStatus">🔄 Running tests...</div>
+            <div id="liveTestResults"></div>
+        `;
+        let job = await streamJob(await response.json(), result => {
+            streamed += 1;
+            const status = document.getElementById('liveTestStatus');
+            const live = document.getElementById('liveTestResults');
+            if (status) status.textContent = `🔄 Running tests... ${streamed} finished`;
+            if (live) live.insertAdjacentHTML('beforeend', renderTestResult(result));
+        });
+        if (job.status === 'lost') {
+            // Re-running here could run the code twice; let the user decide
+            throw new Error('The server no longer knows this test run (it may have restarted). Please run the tests again.');
+        }
+        if (job.status === 'cancelled') {
+            resultsPanel.innerHTML = '<div class="placeholder">Test run cancelled.</div>';
+            return;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Test run failed');
+        }
+        const result = job.response;
         
         if (result.errors && result.errors.length > 0) {
             let errorHtml = result.errors.map(err => `
@@ -534,11 +576,13 @@ async function runTests() {
             `).join('');
             
             const resultsHtml = result.results && result.results.length > 0 
-                ? renderTestResults(result.results, result.errors)
+                ? renderTestResults(result.results, result.errors, result.totals)
                 : '';
-            resultsPanel.innerHTML = errorHtml + resultsHtml;
+            resultsPanel.innerHTML = errorHtml + resultsHtml + renderSkippedCases(result)
+                + renderProcessOutput(result.process_output);
         } else if (result.results && result.results.length > 0) {
-            resultsPanel.innerHTML = renderTestResults(result.results, result.errors || []);
+            resultsPanel.innerHTML = renderTestResults(result.results, result.errors || [], result.totals)
+                + renderSkippedCases(result) + renderProcessOutput(result.process_output);
             
             if (result.all_passed) {
                 // Increment success count
@@ -577,8 +621,443 @@ async function runTests() {
     }
 }
 
+// Note that a fail-fast run stopped before the remaining cases
+function renderSkippedCases(result) {
+    if (!result.skipped_cases) return '';
+    return `
+        <div class="placeholder">
+            ⏭️ Stopped at the first failure (fail-fast): ${result.skipped_cases} more test case${result.skipped_cases > 1 ? 's' : ''} not run.
+        </div>
+    `;
+}
+
+// Follow an execution job's result stream, calling onResult(result) per finished case.
+// Falls back to polling if the stream breaks; returns the final job snapshot.
+async function streamJob(job, onResult) {
+    let finalJob = null;
+    let seen = 0;
+    try {
+        const response = await fetch(job.stream_url);
+        if (response.ok) {
+            await readEventStream(response, (eventType, data) => {
+                if (eventType === 'result') {
+                    seen = data.index + 1;
+                    onResult(data.result);
+                } else if (eventType === 'done') {
+                    data.results.forEach(onResult);
+                    finalJob = data;
+                }
+            });
+        }
+    } catch (error) {
+        console.warn('Result stream interrupted, polling instead:', error);
+    }
+    return finalJob || waitForJob({ ...job, results_count: seen });
+}
+
+// Poll an execution job until it finishes; returns the final job snapshot,
+// with status 'lost' if the server process answering does not know the job
+async function waitForJob(job, intervalMs = 250) {
+    while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+        // Only the final response is needed here, so skip results already counted
+        const response = await fetch(`${job.poll_url}?since=${job.results_count}`);
+        if (response.status === 404) {
+            return { ...job, status: 'lost' };
+        }
+        if (!response.ok) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || `Server error: ${response.status}`);
+        }
+        job = await response.json();
+    }
+    return job;
+}
+
+// Format a duration in milliseconds for display
+function formatDuration(ms) {
+    if (ms === undefined || ms === null) return '-';
+    if (ms < 1) return `${Math.round(ms * 1000)} µs`;
+    if (ms < 1000) return `${ms.toFixed(ms < 10 ? 2 : 1)} ms`;
+    return `${(ms / 1000).toFixed(2)} s`;
+}
+
+// Format a memory size in kilobytes for display
+function formatMemory(kb) {
+    if (kb === undefined || kb === null) return '-';
+    if (kb < 1024) return `${kb.toFixed(1)} KB`;
+    return `${(kb / 1024).toFixed(2)} MB`;
+}
+
+// Render the CPU / wall time / peak memory line of a test case or run
+function renderMetrics(metrics) {
+    if (!metrics || metrics.cpu_ms === undefined) return '';
+    return `
+        <div class="test-metrics">
+            ⏱️ CPU ${formatDuration(metrics.cpu_ms)}
+            · Wall ${formatDuration(metrics.wall_ms)}
+            · 💾 Peak ${formatMemory(metrics.peak_memory_kb)}
+        </div>
+    `;
+}
+
+// Estimate time complexity from timings on generated inputs
+async function probeComplexity() {
+    if (!currentQuestion) return;
+    
+    const code = editor.getValue();
+    const resultsPanel = document.getElementById('resultsContent');
+    const complexityBtn = document.getElementById('complexityBtn');
+    
+    setButtonLoading(complexityBtn, 'Measuring...', '📈 Complexity');
+    resultsPanel.innerHTML = '<div class="loading">🔄 Timing your solution on growing inputs... Please wait.</div>';
+    
+    try {
+        const response = await fetch('/api/complexity', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                code: code,
+                question_id: currentQuestion.id
+            })
+        });
+        
+        const result = await response.json();
+        if (response.status === 503 && result.busy) {
+            resultsPanel.innerHTML = renderBusyMessage(result);
+            return;
+        }
+        if (!response.ok || result.error) {
+            resultsPanel.innerHTML = `
+                <div class="error-message">
+                    <strong>❌ Complexity Probe Failed</strong><br>
+                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${escapeHtml(result.error || `Server error: ${response.status}`)}</pre>
+                </div>
+            `;
+            return;
+        }
+        resultsPanel.innerHTML = renderComplexityResult(result);
+    } catch (error) {
+        console.error('Complexity probe error:', error);
+        resultsPanel.innerHTML = `
+            <div class="error-message">
+                <strong>❌ Error Estimating Complexity</strong><br><br>
+                ${escapeHtml(error.message)}
+            </div>
+        `;
+    } finally {
+        restoreButton(complexityBtn);
+    }
+}
+
+// Render the complexity verdict and the timing samples behind it
+function renderComplexityResult(result) {
+    if (!result.supported) {
+        return `<div class="placeholder">📈 ${escapeHtml(result.message)}</div>`;
+    }
+    
+    const summaryClass = {matches: 'passed', faster: 'passed', slower: 'failed'}[result.verdict] || 'partial';
+    const summaryIcon = {matches: '✅', faster: '🚀', slower: '🐢', inconclusive: '⚠️'}[result.verdict] || '📈';
+    const rows = (result.samples || []).map(sample => `
+        <tr><td>${sample.n.toLocaleString()}</td><td>${formatDuration(sample.ms)}</td></tr>
+    `).join('');
+    
+    return `
+        <div class="test-summary ${summaryClass}">
+            ${summaryIcon} ${escapeHtml(result.message)}
+        </div>
+        <table class="complexity-samples">
+            <thead><tr><th>n</th><th>time</th></tr></thead>
+            <tbody>${rows}</tbody>
+        </table>
+    `;
+}
+
+// Run the size-tiered stress suites (small / medium / large) with time limits
+async function runStressTests() {
+    if (!currentQuestion) return;
+    
+    const code = editor.getValue();
+    const resultsPanel = document.getElementById('resultsContent');
+    const stressBtn = document.getElementById('stressBtn');
+    
+    setButtonLoading(stressBtn, 'Stressing...', '🏋️ Stress');
+    resultsPanel.innerHTML = '<div class="loading">🔄 Running stress tiers... Please wait.</div>';
+    
+    try {
+        const response = await fetch('/api/stress', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                code: code,
+                question_id: currentQuestion.id
+            })
+        });
+        
+        const result = await response.json();
+        if (response.status === 503 && result.busy) {
+            resultsPanel.innerHTML = renderBusyMessage(result);
+            return;
+        }
+        if (!response.ok || result.error) {
+            resultsPanel.innerHTML = `
+                <div class="error-message">
+                    <strong>❌ Stress Test Failed</strong><br>
+                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${escapeHtml(result.error || `Server error: ${response.status}`)}</pre>
+                </div>
+            `;
+            return;
+        }
+        if (!result.supported) {
+            resultsPanel.innerHTML = `<div class="placeholder">🏋️ ${escapeHtml(result.message)}</div>`;
+            return;
+        }
+        resultsPanel.innerHTML = renderStressResult(result);
+    } catch (error) {
+        console.error('Stress test error:', error);
+        resultsPanel.innerHTML = `
+            <div class="error-message">
+                <strong>❌ Error Running Stress Tests</strong><br><br>
+                ${escapeHtml(error.message)}
+            </div>
+        `;
+    } finally {
+        restoreButton(stressBtn);
+    }
+}
+
+// Render per-tier stress verdicts
+function renderStressResult(result) {
+    const verdictText = {
+        AC: 'Accepted', OK: 'Finished in time', WA: 'Wrong Answer', TLE: 'Time Limit Exceeded',
+        MLE: 'Memory Limit Exceeded', RE: 'Runtime Error', SKIPPED: 'Skipped'
+    };
+    const passed = result.verdict === 'AC';
+    // OK: everything finished in time but no output could be checked
+    const unchecked = result.verdict === 'OK';
+    const tierIcon = tier => tier.verdict === 'AC' ? '✅' : tier.verdict === 'OK' ? '⏱️' : tier.verdict === 'SKIPPED' ? '⏭️' : '❌';
+    const rows = result.tiers.map(tier => `
+        <tr>
+            <td style="text-align: left;">${tier.name}</td>
+            <td>${tier.n ? tier.n.toLocaleString() : 'inline'}</td>
+            <td>${tier.checked === tier.cases ? tier.cases : `${tier.cases} (${tier.checked || 0} checked)`}</td>
+            <td>${formatDuration(tier.max_seconds * 1000)}</td>
+            <td>${formatDuration(tier.budget_seconds * 1000)}</td>
+            <td style="text-align: left;">${tierIcon(tier)} ${verdictText[tier.verdict] || tier.verdict}${tier.failed_case ? ` (case ${tier.failed_case})` : ''}</td>
+        </tr>
+        ${tier.error ? `<tr><td colspan="6" style="text-align: left;"><pre style="margin: 0; color: var(--error);">${escapeHtml(tier.error)}</pre></td></tr>` : ''}
+    `).join('');
+    
+    return `
+        <div class="test-summary ${passed ? 'passed' : unchecked ? 'partial' : 'failed'}">
+            ${passed ? '✅' : unchecked ? '⏱️' : '❌'} ${verdictText[result.verdict] || result.verdict}${unchecked ? ' (correctness not checked)' : ''}
+            <div class="test-metrics">${result.reference_checked ? 'Generated tiers checked against the reference solution. ' : 'No reference solution, so generated tiers are only timed. '}${result.complexity_source === 'reference'
+                ? `Generated tiers allow ${result.reference_slack}x the reference solution's time per case (no expected complexity recorded)`
+                : `Time limits assume ${escapeHtml(result.expected_complexity)}${result.complexity_source === 'default' ? ' (no expected complexity recorded)' : ''}`}</div>
+        </div>
+        <table class="complexity-samples">
+            <thead><tr><th style="text-align: left;">tier</th><th>n</th><th>cases</th><th>slowest</th><th>limit</th><th style="text-align: left;">verdict</th></tr></thead>
+            <tbody>${rows}</tbody>
+        </table>
+    `;
+}
+
+// Compare the solution with the reference solution on random inputs
+async function runFuzzTests() {
+    if (!currentQuestion) return;
+    
+    const code = editor.getValue();
+    const resultsPanel = document.getElementById('resultsContent');
+    const fuzzBtn = document.getElementById('fuzzBtn');
+    
+    setButtonLoading(fuzzBtn, 'Fuzzing...', '🎲 Fuzz');
+    resultsPanel.innerHTML = '<div class="loading">🔄 Comparing with the reference solution on random inputs... Please wait.</div>';
+    
+    try {
+        const response = await fetch('/api/fuzz', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                code: code,
+                question_id: currentQuestion.id
+            })
+        });
+        
+        const result = await response.json();
+        if (response.status === 503 && result.busy) {
+            resultsPanel.innerHTML = renderBusyMessage(result);
+            return;
+        }
+        if (!response.ok || result.error) {
+            resultsPanel.innerHTML = `
+                <div class="error-message">
+                    <strong>❌ Fuzzing Failed</strong><br>
+                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${escapeHtml(result.error || `Server error: ${response.status}`)}</pre>
+                </div>
+            `;
+            return;
+        }
+        if (!result.supported) {
+            resultsPanel.innerHTML = `<div class="placeholder">🎲 ${escapeHtml(result.message)}</div>`;
+            return;
+        }
+        resultsPanel.innerHTML = renderFuzzResult(result);
+    } catch (error) {
+        console.error('Fuzz error:', error);
+        resultsPanel.innerHTML = `
+            <div class="error-message">
+                <strong>❌ Error Fuzzing</strong><br><br>
+                ${escapeHtml(error.message)}
+            </div>
+        `;
+    } finally {
+        restoreButton(fuzzBtn);
+    }
+}
+
+// Render the fuzzing verdict and the first input where the solutions disagree
+function renderFuzzResult(result) {
+    const agreed = result.verdict === 'agreed';
+    // Inconclusive: every input was skipped, so nothing was compared
+    const inconclusive = result.verdict === 'inconclusive';
+    const divergence = result.divergence;
+    let details = '';
+    if (divergence) {
+        const label = divergence.in_place ? 'Arguments after the call' : 'Output';
+        details = `
+            <div class="test-result failed">
+                <div class="test-result-details">
+                    <strong>Input:</strong> <code>${escapeHtml(JSON.stringify(divergence.input))}</code><br>
+                    <strong>Reference ${divergence.in_place ? 'arguments after the call' : 'output'}:</strong> <code>${escapeHtml(JSON.stringify(divergence.expected))}</code><br>
+                    ${divergence.error
+                        ? `<strong>Your code raised:</strong><pre style="margin: 0.25rem 0 0; white-space: pre-wrap; color: var(--error);">${escapeHtml(divergence.error)}</pre>`
+                        : `<strong>Your ${label.toLowerCase()}:</strong> <code>${escapeHtml(JSON.stringify(divergence.output))}</code>`}
+                </div>
+            </div>
+            <div class="placeholder">
+                <small>Random inputs may break constraints the problem guarantees (e.g. exactly one answer); check the input before changing your code.</small>
+            </div>
+        `;
+    }
+    return `
+        <div class="test-summary ${agreed ? 'passed' : inconclusive ? 'partial' : 'failed'}">
+            ${agreed ? '✅' : inconclusive ? '⚠️' : '❌'} ${escapeHtml(result.message)}
+            <div class="test-metrics">🎲 ${result.cases.toLocaleString()} cases${result.cases_per_second ? ` · ${result.cases_per_second.toLocaleString()} cases/s` : ''}</div>
+        </div>
+        ${details}
+    `;
+}
+
+// Time the solution against the reference solution on the same input
+async function runBenchmark() {
+    if (!currentQuestion) return;
+    
+    const code = editor.getValue();
+    const resultsPanel = document.getElementById('resultsContent');
+    const benchmarkBtn = document.getElementById('benchmarkBtn');
+    
+    setButtonLoading(benchmarkBtn, 'Benchmarking...', '⏱️ Benchmark');
+    resultsPanel.innerHTML = '<div class="loading">🔄 Timing your solution against the reference solution... Please wait.</div>';
+    
+    try {
+        const response = await fetch('/api/benchmark', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                code: code,
+                question_id: currentQuestion.id
+            })
+        });
+        
+        const result = await response.json();
+        if (response.status === 503 && result.busy) {
+            resultsPanel.innerHTML = renderBusyMessage(result);
+            return;
+        }
+        if (!response.ok || result.error) {
+            resultsPanel.innerHTML = `
+                <div class="error-message">
+                    <strong>❌ Benchmark Failed</strong><br>
+                    <pre style="margin-top: 0.5rem; white-space: pre-wrap;">${escapeHtml(result.error || `Server error: ${response.status}`)}</pre>
+                </div>
+            `;
+            return;
+        }
+        if (!result.supported) {
+            resultsPanel.innerHTML = `<div class="placeholder">⏱️ ${escapeHtml(result.message)}</div>`;
+            return;
+        }
+        resultsPanel.innerHTML = renderBenchmarkResult(result);
+    } catch (error) {
+        console.error('Benchmark error:', error);
+        resultsPanel.innerHTML = `
+            <div class="error-message">
+                <strong>❌ Error Benchmarking</strong><br><br>
+                ${escapeHtml(error.message)}
+            </div>
+        `;
+    } finally {
+        restoreButton(benchmarkBtn);
+    }
+}
+
+// Render the head-to-head timings as a small table
+function renderBenchmarkResult(result) {
+    const icons = { within_target: '✅', slower: '⚠️', inconclusive: '⚠️' };
+    const classes = { within_target: 'passed', slower: 'partial', inconclusive: 'partial' };
+    const icon = icons[result.verdict] || '❌';
+    const summaryClass = classes[result.verdict] || 'failed';
+    const row = (label, stats) => stats ? `
+        <tr>
+            <td>${label}</td>
+            <td>${stats.median_ms.toLocaleString()} ms</td>
+            <td>${stats.q1_ms.toLocaleString()} – ${stats.q3_ms.toLocaleString()} ms</td>
+            <td>${formatMemory(stats.peak_memory_kb)}</td>
+            <td>${stats.runs}</td>
+        </tr>
+    ` : '';
+    const table = (result.user || result.reference) ? `
+        <table class="benchmark-table">
+            <thead>
+                <tr><th></th><th>Median</th><th>IQR</th><th>Peak memory</th><th>Runs</th></tr>
+            </thead>
+            <tbody>
+                ${row('Your solution', result.user)}
+                ${row('Reference', result.reference)}
+            </tbody>
+        </table>
+    ` : '';
+    const pinned = result.pinned_cpu !== null && result.pinned_cpu !== undefined ? ` · pinned to CPU ${result.pinned_cpu}` : '';
+    return `
+        <div class="test-summary ${summaryClass}">
+            ${icon} ${escapeHtml(result.message)}
+            <div class="test-metrics">⏱️ n = ${result.n ? result.n.toLocaleString() : '?'} · target ${result.target_ratio}x${pinned}</div>
+        </div>
+        ${table}
+    `;
+}
+
+// Render output written straight to the process's stdout/stderr (outside test capture)
+function renderProcessOutput(output) {
+    if (!output || !output.trim()) return '';
+    return `
+        <div class="console-output">
+            <strong>🖥️ Process Output:</strong>
+            <pre>${escapeHtml(output)}</pre>
+        </div>
+    `;
+}
+
 // Render test results with summary
-function renderTestResults(results, errors) {
+function renderTestResults(results, errors, totals) {
     if (!results || results.length === 0) {
         return '';
     }
@@ -605,6 +1084,8 @@ function renderTestResults(results, errors) {
     let html = `
         <div class="test-summary ${summaryClass}">
             ${summaryIcon} ${summaryText}
+            ${totals ? renderMetrics(totals) : ''}
+            ${totals && totals.slowest_case && total > 1 ? `<div class="test-metrics">🐢 Slowest: Test Case ${totals.slowest_case}</div>` : ''}
         </div>
     `;
     
@@ -657,21 +1138,53 @@ function renderTestResult(result) {
                 </div>
                 ${result.expected !== undefined && result.expected !== null ? `
                 <div style="margin-bottom: 0.5rem;">
-                    <strong>Expected:</strong><br>
+                    <strong>Expected:</strong>${renderTruncatedNote(result.expected_length)}<br>
                     <code>${expectedStr}</code>
                 </div>
                 ` : ''}
                 <div>
-                    <strong>Got:</strong><br>
+                    <strong>Got:</strong>${renderTruncatedNote(result.output_length)}<br>
                     <code style="color: ${result.passed ? 'var(--success)' : 'var(--error)'};">${outputStr}</code>
                 </div>
+                ${renderOutputDiff(result.diff)}
                 ${errorMessage}
+                ${renderMetrics(result)}
                 ${consoleOutput}
             </div>
         </div>
     `;
 }
 
+// Large outputs come back as their first few items
+function renderTruncatedNote(length) {
+    if (length === undefined || length === null) return '';
+    return ` <small style="color: var(--text-sub);">(first 20 of ${length.toLocaleString()})</small>`;
+}
+
+// Where a large output differs from the expected one
+function renderOutputDiff(diff) {
+    if (!diff) return '';
+    let details;
+    if (diff.missing || diff.unexpected) {
+        details = `
+            <strong>Missing:</strong> <code>${escapeHtml(JSON.stringify(diff.missing))}</code><br>
+            <strong>Unexpected:</strong> <code>${escapeHtml(JSON.stringify(diff.unexpected))}</code>
+        `;
+    } else {
+        details = `
+            <strong>First difference at index ${diff.index.toLocaleString()}</strong> (items ${diff.start.toLocaleString()}…)<br>
+            <strong>Expected:</strong> <code>${escapeHtml(JSON.stringify(diff.expected))}</code><br>
+            <strong>Got:</strong> <code>${escapeHtml(JSON.stringify(diff.output))}</code>
+        `;
+    }
+    return `
+        <div style="margin-top: 0.5rem;">
+            <small style="color: var(--text-sub);">Lengths: got ${diff.output_length.toLocaleString()}, expected ${diff.expected_length.toLocaleString()}</small><br>
+            ${details}
+        </div>
+    `;
+}
+
 // Copy test case to clipboard
 function copyTestCase(testId, event) {
     const element = document.getElementById(testId);
@@ -701,7 +1214,55 @@ function copyTestCase(testId, event) {
     });
 }
 
-// Get hint with timeout and better error handling
+// Format hint markdown-ish text as HTML
+function formatHint(text) {
+    return text
+        .replace(/\*\*(.+?)\*\*/g, '<strong>$1</strong>')
+        .replace(/```python\n([\s\S]*?)```/g, '<pre><code>$1</code></pre>')
+        .replace(/```([\s\S]*?)```/g, '<pre><code>$1</code></pre>')
+        .split('\n')
+        .map(line => {
+            const trimmed = line.trim();
+            if (!trimmed) return '';
+            if (trimmed.startsWith('- ') || trimmed.startsWith('• ')) {
+                return `<li>${trimmed.substring(2)}</li>`;
+            }
+            if (trimmed.startsWith('1. ') || trimmed.match(/^\d+\. /)) {
+                return `<li>${trimmed.replace(/^\d+\. /, '')}</li>`;
+            }
+            return `<p>${trimmed}</p>`;
+        })
+        .join('');
+}
+
+// Read a Server-Sent Events response body, calling onEvent(type, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.substring(0, boundary);
+            buffer = buffer.substring(boundary + 2);
+            
+            let eventType = 'message';
+            let data = '';
+            rawEvent.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) eventType = line.substring(7);
+                else if (line.startsWith('data: ')) data += line.substring(6);
+            });
+            if (data) onEvent(eventType, JSON.parse(data));
+        }
+    }
+}
+
+// Get hint, rendering tokens progressively as the server streams them
 async function getHint(hintType = 'general') {
     if (!currentQuestion) {
         console.log('No question selected');
@@ -713,29 +1274,21 @@ async function getHint(hintType = 'general') {
     const hintContent = document.getElementById('hintContent');
     const hintPanel = document.getElementById('hintPanel');
     
-    // Show loading state with timeout warning
+    // Show loading state
     const hintBtn = document.getElementById('hintBtn');
     setButtonLoading(hintBtn, 'Generating Hint...', '💡 Get Hint');
     
-    let timeoutWarning = null;
-    hintContent.innerHTML = '<div class="loading">🤔 Generating hint... (this may take 15-30 seconds on first request)</div>';
+    hintContent.innerHTML = '<div class="loading">🤔 Generating hint... (the first request may take longer while the LLM loads)</div>';
     hintPanel.classList.add('visible');
     
-    // Set up timeout warning after 10 seconds
-    timeoutWarning = setTimeout(() => {
-        if (hintContent.innerHTML.includes('Generating hint')) {
-            hintContent.innerHTML = '<div class="loading">🤔 Still generating... LLM is processing (this can take up to 30 seconds)</div>';
-        }
-    }, 10000);
+    // Abort if the stream stalls; every received event resets the timer
+    const controller = new AbortController();
+    let timeoutId = setTimeout(() => controller.abort(), 45000);
     
     try {
-        console.log('Fetching hint from API...');
-        
-        // Create AbortController for timeout
-        const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), 45000); // 45 second timeout
+        console.log('Streaming hint from API...');
         
-        const response = await fetch('/api/hint', {
+        const response = await fetch('/api/hint/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -748,12 +1301,6 @@ async function getHint(hintType = 'general') {
             signal: controller.signal
         });
         
-        clearTimeout(timeoutId);
-        if (timeoutWarning) clearTimeout(timeoutWarning);
-        
-        // Restore hint button
-        restoreButton(hintBtn);
-        
         console.log('Response status:', response.status);
         
         if (!response.ok) {
@@ -761,30 +1308,29 @@ async function getHint(hintType = 'general') {
             throw new Error(`Server error: ${response.status} - ${errorText.substring(0, 200)}`);
         }
         
-        const result = await response.json();
-        console.log('Hint received:', result);
+        let streamedText = '';
+        let finalHint = null;
         
-        if (result && result.hint) {
-            // Format hint with better HTML
-            const formattedHint = result.hint
-                .replace(/\*\*(.+?)\*\*/g, '<strong>$1</strong>')
-                .replace(/```python\n([\s\S]*?)```/g, '<pre><code>$1</code></pre>')
-                .replace(/```([\s\S]*?)```/g, '<pre><code>$1</code></pre>')
-                .split('\n')
-                .map(line => {
-                    const trimmed = line.trim();
-                    if (!trimmed) return '';
-                    if (trimmed.startsWith('- ') || trimmed.startsWith('• ')) {
-                        return `<li>${trimmed.substring(2)}</li>`;
-                    }
-                    if (trimmed.startsWith('1. ') || trimmed.match(/^\d+\. /)) {
-                        return `<li>${trimmed.replace(/^\d+\. /, '')}</li>`;
-                    }
-                    return `<p>${trimmed}</p>`;
-                })
-                .join('');
+        await readEventStream(response, (eventType, data) => {
+            clearTimeout(timeoutId);
+            timeoutId = setTimeout(() => controller.abort(), 45000);
             
-            hintContent.innerHTML = `<div class="hint-message">${formattedHint}</div>`;
+            if (eventType === 'token') {
+                streamedText += data.text;
+                hintContent.innerHTML = `<div class="hint-message">${formatHint(streamedText)}</div>`;
+            } else if (eventType === 'reset') {
+                streamedText = '';
+            } else if (eventType === 'done') {
+                finalHint = data.hint;
+                console.log('Hint received from:', data.source);
+            }
+        });
+        
+        clearTimeout(timeoutId);
+        restoreButton(hintBtn);
+        
+        if (finalHint) {
+            hintContent.innerHTML = `<div class="hint-message">${formatHint(finalHint)}</div>`;
             console.log('✅ Hint displayed successfully');
         } else {
             console.log('No hint in response, showing fallback');
@@ -799,7 +1345,7 @@ async function getHint(hintType = 'general') {
             `;
         }
     } catch (error) {
-        if (timeoutWarning) clearTimeout(timeoutWarning);
+        clearTimeout(timeoutId);
         restoreButton(hintBtn);
         console.error('❌ Error getting hint:', error);
         
@@ -1147,6 +1693,10 @@ document.addEventListener('DOMContentLoaded', function() {
     // Setup button event listeners
     const compileBtn = document.getElementById('compileBtn');
     const runBtn = document.getElementById('runBtn');
+    const complexityBtn = document.getElementById('complexityBtn');
+    const stressBtn = document.getElementById('stressBtn');
+    const fuzzBtn = document.getElementById('fuzzBtn');
+    const benchmarkBtn = document.getElementById('benchmarkBtn');
     const hintBtn = document.getElementById('hintBtn');
     const resetBtn = document.getElementById('resetBtn');
     const clearResultsBtn = document.getElementById('clearResultsBtn');
@@ -1156,6 +1706,10 @@ document.addEventListener('DOMContentLoaded', function() {
     
     if (compileBtn) compileBtn.addEventListener('click', compileCode);
     if (runBtn) runBtn.addEventListener('click', runTests);
+    if (complexityBtn) complexityBtn.addEventListener('click', probeComplexity);
+    if (stressBtn) stressBtn.addEventListener('click', runStressTests);
+    if (fuzzBtn) fuzzBtn.addEventListener('click', runFuzzTests);
+    if (benchmarkBtn) benchmarkBtn.addEventListener('click', runBenchmark);
     if (hintBtn) hintBtn.addEventListener('click', () => getHint('general'));
     if (resetBtn) resetBtn.addEventListener('click', resetCode);
     if (clearResultsBtn) clearResultsBtn.addEventListener('click', clearResults);
@@ -0,0 +1,145 @@
+"""
+Size-tiered stress suites.
+Every question gets a small tier (its inline test cases) plus medium and large
+tiers generated in the sandbox from a seed. Tier sizes and time budgets are
+derived from the expected time complexity, so an O(n²) solution to an O(n)
+problem runs out of time on the large tier the way it would on LeetCode.
+Without a known complexity, each case's budget is a multiple of the reference
+solution's time on it. Sizes never exceed the problem's constraints.
+"""
+import zlib
+from typing import Dict, List, Optional
+
+from complexity import COMPLEXITY_CLASSES
+from input_generators import max_size
+
+# Complexity assumed when the knowledge base records none
+DEFAULT_COMPLEXITY = 'O(n log n)'
+
+# Target work per tier in "operations" of the expected complexity
+TIER_OPS = {'medium': 10 ** 4, 'large': 10 ** 6}
+TIER_CASES = {'small': None, 'medium': 3, 'large': 1}
+MAX_TIER_SIZE = 100000
+
+# Budget per case: fixed overhead plus SLACK x expected operations x cost per operation
+BASE_SECONDS = 0.1
+SECONDS_PER_OP = 2.5e-7
+SLACK = 8
+SMALL_CASE_SECONDS = 1.0
+# Seconds the reference solution may take on one generated case to produce its expected output
+REFERENCE_CASE_SECONDS = 2.0
+# Longest budget derived from the reference's time (BASE_SECONDS + SLACK x its seconds)
+MAX_REFERENCE_BUDGET_SECONDS = 3.0
+
+_GROWTH = dict(COMPLEXITY_CLASSES)
+
+
+def _ops(complexity: str, n: int) -> float:
+    """Work done by an algorithm of the given class on an input of size n (at least n)."""
+    return max(float(n), _GROWTH[complexity](n))
+
+
+def size_for_ops(complexity: str, ops: float, limit: int = MAX_TIER_SIZE) -> int:
+    """Largest n (up to limit) whose expected work stays within ops."""
+    low, high = 1, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _ops(complexity, mid) <= ops:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def time_budget(complexity: str, n: int) -> float:
+    """Seconds one case of size n may take before it is a time-limit-exceeded."""
+    return round(BASE_SECONDS + SLACK * SECONDS_PER_OP * _ops(complexity, n), 3)
+
+
+def tier_seed(question_id: str, tier: str) -> int:
+    """Stable seed per question and tier, so generated suites never change between runs."""
+    return zlib.crc32(f'{question_id}:{tier}'.encode('utf-8'))
+
+
+def small_tier_cases(question: Dict) -> List[Dict]:
+    """Inline test cases with an expected output (the bank also holds placeholder examples)."""
+    return [case for case in question.get('test_cases', []) if case.get('expected') is not None]
+
+
+def build_tiers(question: Dict, expected: Optional[str], reference_timed: bool = False) -> List[Dict]:
+    """
+    Plan the stress tiers for a question.
+
+    Sizes aim at TIER_OPS of the expected complexity (DEFAULT_COMPLEXITY when
+    unknown) without passing the question's max_size. When the complexity is
+    unknown and reference_timed, generated tiers also carry 'reference_slack',
+    'base_seconds' and 'max_budget_seconds': each case's budget is then
+    base_seconds plus reference_slack times the reference's time on it (at
+    most max_budget_seconds), and budget_seconds is only the fallback for
+    cases the reference fails on.
+
+    A question may override any tier's n, seed, cases or budget_seconds with
+    a 'stress_tiers' entry, e.g. {"large": {"n": 50000}}.
+
+    Returns:
+        [{'name', 'n', 'seed', 'cases', 'budget_seconds'}] from small to large
+    """
+    complexity = expected or DEFAULT_COMPLEXITY
+    overrides = question.get('stress_tiers') or {}
+    question_id = question.get('id', '')
+    limit = min(MAX_TIER_SIZE, max_size(question))
+
+    tiers = [{
+        'name': 'small',
+        'n': None,
+        'seed': None,
+        'cases': len(small_tier_cases(question)),
+        'budget_seconds': SMALL_CASE_SECONDS
+    }]
+    for name, ops in TIER_OPS.items():
+        n = size_for_ops(complexity, ops, limit)
+        tier = {
+            'name': name,
+            'n': n,
+            'seed': tier_seed(question_id, name),
+            'cases': TIER_CASES[name],
+            'budget_seconds': time_budget(complexity, n)
+        }
+        if expected is None and reference_timed:
+            tier.update(reference_slack=SLACK, base_seconds=BASE_SECONDS,
+                        max_budget_seconds=MAX_REFERENCE_BUDGET_SECONDS)
+        tiers.append(tier)
+
+    for tier in tiers:
+        tier.update(overrides.get(tier['name'], {}))
+    return tiers
+
+
+def cpu_allowance(tiers: List[Dict], checked: bool) -> float:
+    """
+    CPU seconds a stress run may use: every case at its budget, plus the
+    reference's time limit on each generated case when checked against it.
+    """
+    total = 0.0
+    for tier in tiers:
+        per_case = tier['budget_seconds']
+        if tier.get('reference_slack'):
+            per_case = max(per_case, tier['max_budget_seconds'])
+        if checked and tier['name'] != 'small':
+            per_case += max(tier['budget_seconds'], REFERENCE_CASE_SECONDS)
+        total += per_case * (tier.get('cases') or 0)
+    return total
+
+
+def overall_verdict(tier_results: List[Dict]) -> str:
+    """
+    The first non-passing tier verdict, LeetCode style. When all pass: 'AC'
+    if some output was actually checked, else 'OK' (finished in time,
+    correctness not checked).
+    """
+    for result in tier_results:
+        if result['verdict'] not in ('AC', 'OK'):
+            return result['verdict']
+    if any(result['verdict'] == 'AC' for result in tier_results):
+        return 'AC'
+    return 'OK'